@@ -28,6 +28,11 @@ def main():
         for h in real_logger.handlers[:]:
             if isinstance(h, logging.StreamHandler):
                 real_logger.removeHandler(h)
+    # The console handler lives on the logger's writer thread; the log file stays
+    if getattr(logger, 'listener', None) is not None:
+        logger.listener.handlers = tuple(
+            h for h in logger.listener.handlers
+            if not isinstance(h, logging.StreamHandler) or isinstance(h, logging.FileHandler))
 
     monitor = SystemMonitor(watch_paths=paths_to_watch)
     
@@ -2,9 +2,10 @@ import argparse
 import sys
 import os
 from src.monitor import SystemMonitor
-from src.logger import logger
+from src.logger import logger, CATEGORY_FILE, CATEGORY_USB, CATEGORY_STATUS
 from src.banner import show_banner
 from src.cli import show_menu
+from src.sniffer import BINARY_MODES
 
 def main():
     show_banner()
@@ -12,6 +13,17 @@ def main():
     parser.add_argument("--path", type=str, default=".", help="Directory path to monitor (default: current dir)")
     parser.add_argument("--no-user-dirs", action="store_true", help="DISABLE monitoring of User Desktop, Documents, and Downloads")
     parser.add_argument("--external", action="store_true", help="Enable External Drive Scanner (USB)")
+    parser.add_argument("--workers", type=int, default=4, help="Number of file scan worker threads (default: 4)")
+    parser.add_argument("--ner-processes", type=int, default=0, help="Run NLP scanning in N separate processes (default: 0, in-thread)")
+    parser.add_argument("--keywords", type=str, help="File of confidential terms to detect, one per line (reloaded on change)")
+    parser.add_argument("--no-ner-prefilter", action="store_true", help="Run NLP on every text, even ones with no capitalized words or amounts")
+    parser.add_argument("--rescan", action="store_true", help="Ignore the scan index and rescan every file")
+    parser.add_argument("--cache-file", type=str, help="Keep scan results by content hash in this file across restarts")
+    parser.add_argument("--filter-config", type=str, help="JSON file with exclude globs, extensions and size limits for scanned files")
+    parser.add_argument("--extract-processes", type=int, default=2, help="Processes extracting text from Office/PDF files (default: 2, 0 reads Office files as plain archives)")
+    parser.add_argument("--extract-timeout", type=float, default=30.0, help="Seconds before a document's text extraction is abandoned (default: 30)")
+    parser.add_argument("--binary-files", choices=BINARY_MODES, default="skip", help="Binary files with a text extension: skip them (default) or scan their printable strings")
+    parser.add_argument("--queue-size", type=int, default=1000, help="Max pending scan jobs before intake slows down (default: 1000)")
     args = parser.parse_args()
 
     # Collect paths to monitor
@@ -27,11 +39,18 @@ def main():
                 
     paths_to_watch = list(set(paths_to_watch))
 
-    logger.info("Starting DLP Solution...")
-    logger.info(f"Monitoring directories")
+    logger.info("Starting DLP Solution...", category=CATEGORY_STATUS)
+    logger.info(f"Monitoring directories", category=CATEGORY_FILE)
     
-    monitor = SystemMonitor(watch_paths=paths_to_watch)
-    logger.info("System Monitors Active...")
+    monitor = SystemMonitor(watch_paths=paths_to_watch, scan_workers=args.workers,
+                            ner_processes=args.ner_processes, queue_size=args.queue_size,
+                            ner_prefilter=not args.no_ner_prefilter, keyword_file=args.keywords,
+                            cache_path=args.cache_file, filter_config=args.filter_config,
+                            extract_processes=args.extract_processes, extract_timeout=args.extract_timeout,
+                            binary_mode=args.binary_files)
+    if args.rescan and monitor.index:
+        monitor.index.clear()
+    logger.info("System Monitors Active...", category=CATEGORY_STATUS)
     print("")
 
     # Start USB Poller if requested
@@ -50,13 +69,13 @@ def main():
             
     while True:
         try:
-            logger.info("System Monitors Active...")
+            logger.info("System Monitors Active...", category=CATEGORY_STATUS)
             
             # Re-announce status because previous logs were cleared by the menu
             if monitor.usb_thread_running:
-                 logger.info("External Drive Scanner is Active.")
+                 logger.info("External Drive Scanner is Active.", category=CATEGORY_USB)
             
-            logger.info(f"Monitoring directories: {monitor.watch_paths}")
+            logger.info(f"Monitoring directories: {monitor.watch_paths}", category=CATEGORY_FILE)
 
             monitor.start_filesystem_monitor()
             monitor.start_clipboard_monitor() # Blocking call
@@ -68,7 +87,7 @@ def main():
             show_menu(monitor, args, monitor_started=True)
             
             # After returning from menu, we loop back to 'try' and restart monitors
-            logger.info("Resuming System Monitors...")
+            logger.info("Resuming System Monitors...", category=CATEGORY_STATUS)
         except Exception as e:
             logger.exception(f"Unexpected error: {e}")
             sys.exit(1)
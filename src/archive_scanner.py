@@ -0,0 +1,204 @@
+import io
+import os
+import bz2
+import gzip
+import lzma
+import tarfile
+import zipfile
+from .sniffer import open_text
+
+# Containers we look inside. Office files are zip archives of XML.
+ZIP_EXTENSIONS = ('.zip', '.docx', '.xlsx', '.pptx', '.odt', '.ods')
+TAR_EXTENSIONS = ('.tar',)
+# Single compressed streams; '.tgz' etc. are a tar once decompressed
+COMPRESSED = {
+    '.gz': (gzip.GzipFile, ''), '.tgz': (gzip.GzipFile, '.tar'),
+    '.bz2': (bz2.BZ2File, ''), '.tbz2': (bz2.BZ2File, '.tar'),
+    '.xz': (lzma.LZMAFile, ''), '.txz': (lzma.LZMAFile, '.tar'),
+}
+ARCHIVE_EXTENSIONS = ZIP_EXTENSIONS + TAR_EXTENSIONS + tuple(COMPRESSED)
+
+# Members scanned as text (Office documents keep their text in .xml members)
+TEXT_EXTENSIONS = ('.txt', '.csv', '.log', '.md', '.json', '.xml')
+
+def is_archive(path):
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+class ArchiveLimitExceeded(Exception):
+    """An archive went past a safety limit (likely a zip bomb); the rest of it is skipped."""
+
+class _Budget:
+    """Limits shared by everything inside one top-level archive."""
+    def __init__(self, max_bytes, max_members):
+        self.bytes = max_bytes
+        self.members = max_members
+
+    def take_member(self):
+        self.members -= 1
+        if self.members < 0:
+            raise ArchiveLimitExceeded("too many members")
+
+class _Limited:
+    """Readable stream that counts decompressed bytes against the budget."""
+    def __init__(self, stream, budget):
+        self.stream = stream
+        self.budget = budget
+
+    def read(self, n=-1):
+        data = self.stream.read(n)
+        self.budget.bytes -= len(data)
+        if self.budget.bytes < 0:
+            raise ArchiveLimitExceeded("too much decompressed data")
+        return data
+
+    def readable(self):
+        return True
+
+class ArchiveScanner:
+    """
+    Scans archives without extracting them: every member is decompressed as a
+    stream straight into the detector (detector.scan_stream), so memory use doesn't
+    depend on member size. Nested archives are followed up to `max_depth` levels.
+
+    Zip bomb defenses: all decompressed bytes, including members that are only
+    skipped over, count against `max_bytes`; at most `max_members` members are
+    looked at; a zip member claiming a compression ratio above `max_ratio` stops the scan.
+
+    Findings are cached per member (keyed by archive, member name and its
+    CRC/size or tar size/mtime), so when an archive changes only the members
+    that changed are decompressed and scanned again. A member's findings come out
+    in batches of `batch_size` as they are found, and at most `max_cached` of them
+    are kept for the cache, so a huge CSV inside a zip doesn't pile up in memory.
+    """
+    def __init__(self, detector, cache=None, text_extensions=TEXT_EXTENSIONS, max_depth=3,
+                 max_members=10_000, max_bytes=256 * 1024 * 1024, max_ratio=1000,
+                 max_nested_zip=32 * 1024 * 1024, binary_mode='skip', batch_size=100,
+                 max_cached=1000):
+        self.detector = detector
+        # Optional ResultCache (results are dropped when the detection rules change)
+        self.cache = cache
+        self.text_extensions = tuple(e for e in text_extensions if e not in ARCHIVE_EXTENSIONS)
+        self.max_depth = max_depth
+        self.max_members = max_members
+        self.max_bytes = max_bytes
+        self.max_ratio = max_ratio
+        # A zip inside an archive needs random access, so it is read into memory (up to this size)
+        self.max_nested_zip = max_nested_zip
+        # Binary members behind a text name: 'skip' or scan their printable 'strings' (see sniffer.py)
+        self.binary_mode = binary_mode
+        self.batch_size = batch_size
+        self.max_cached = max_cached
+
+    def scan(self, path, regex=True):
+        """
+        Yields (member, findings, cached) batches for the text members of the archive
+        at `path`: a member with many findings comes in several batches, one without
+        any in a single empty one. member is like 'inner.zip!docs/notes.txt'; cached
+        means the findings come from an earlier scan of the same member. Raises ArchiveLimitExceeded when a limit
+        cuts the scan short (after yielding what was scanned until then).
+        With regex=False only NER runs, and nothing is cached.
+        """
+        budget = _Budget(self.max_bytes, self.max_members)
+        # Only complete results (Regex + NER, or Regex once the model is unavailable) may be reused later
+        cacheable = regex and not self.detector.ner_loading
+        with open(path, 'rb') as f:
+            yield from self._scan_entry(path, "", os.path.basename(path), f, 0, budget, regex, cacheable)
+
+    def _scan_entry(self, path, label, name, stream, depth, budget, regex, cacheable):
+        lname = name.lower()
+        for ext, (opener, inner_ext) in COMPRESSED.items():
+            if lname.endswith(ext):
+                # A compression layer isn't a nesting level, but its output counts against the budget
+                inner = _Limited(opener(fileobj=stream) if opener is gzip.GzipFile else opener(stream), budget)
+                inner_name = name[:-len(ext)] + inner_ext
+                if not label and not is_archive(inner_name):
+                    # notes.txt.gz: the text inside is the member
+                    label = inner_name
+                yield from self._scan_entry(path, label, inner_name, inner, depth, budget, regex, cacheable)
+                return
+
+        if lname.endswith(TAR_EXTENSIONS + ZIP_EXTENSIONS):
+            if depth >= self.max_depth:
+                return
+            if lname.endswith(TAR_EXTENSIONS):
+                yield from self._scan_tar(path, label, stream, depth, budget, regex, cacheable)
+            else:
+                yield from self._scan_zip(path, label, stream, depth, budget, regex, cacheable)
+            return
+
+        if label and lname.endswith(self.text_extensions):
+            opened = open_text(stream, self.binary_mode)
+            if opened is None:
+                return
+            stream, encoding = opened
+            batch = []
+            for m in self.detector.scan_stream(stream, regex=regex, encoding=encoding):
+                m["member"] = label
+                batch.append(m)
+                if len(batch) >= self.batch_size:
+                    yield label, batch, False
+                    batch = []
+            yield label, batch, False
+
+    def _scan_members(self, path, label, members, depth, budget, regex, cacheable):
+        # members: (name, identity or None, opener) in archive order
+        for name, identity, open_member in members:
+            budget.take_member()
+            member = f"{label}!{name}" if label else name
+            text = name.lower().endswith(self.text_extensions)
+            key = None
+            if self.cache is not None and identity is not None and text:
+                key = f"member:{path}!{member}:{identity}"
+                cached = self.cache.get(key)
+                if cached is not None:
+                    yield member, cached, True
+                    continue
+            if not text and not is_archive(name):
+                continue
+
+            scanned = False
+            kept = []
+            for found in self._scan_entry(path, member, name, open_member(), depth + 1, budget,
+                                          regex, cacheable):
+                scanned = True
+                if key is not None and len(kept) < self.max_cached:
+                    kept.extend(found[1][:self.max_cached - len(kept)])
+                yield found
+            if key is not None and cacheable and scanned:
+                self.cache.put(key, kept)
+
+    def _scan_zip(self, path, label, stream, depth, budget, regex, cacheable):
+        if not label:
+            zf = zipfile.ZipFile(stream)
+        else:
+            # Nested zip: the central directory is at the end, so it has to be seekable
+            data = stream.read(self.max_nested_zip + 1)
+            if len(data) > self.max_nested_zip:
+                return
+            zf = zipfile.ZipFile(io.BytesIO(data))
+
+        def members():
+            for info in zf.infolist():
+                if info.is_dir() or info.flag_bits & 0x1:
+                    # Folders, and encrypted members we can't read
+                    continue
+                if info.file_size and (not info.compress_size
+                                       or info.file_size / info.compress_size > self.max_ratio):
+                    raise ArchiveLimitExceeded(f"{info.filename} claims a compression ratio over {self.max_ratio}")
+                yield info.filename, f"{info.CRC:08x}:{info.file_size}", \
+                    lambda info=info: _Limited(zf.open(info), budget)
+
+        with zf:
+            yield from self._scan_members(path, label, members(), depth, budget, regex, cacheable)
+
+    def _scan_tar(self, path, label, stream, depth, budget, regex, cacheable):
+        # Stream mode ('r|'): members are read in order, no seeking needed
+        tar = tarfile.open(fileobj=stream, mode='r|')
+
+        def members():
+            for info in tar:
+                if info.isfile():
+                    yield info.name, f"{info.size}:{info.mtime}", lambda info=info: tar.extractfile(info)
+
+        with tar:
+            yield from self._scan_members(path, label, members(), depth, budget, regex, cacheable)
@@ -0,0 +1,95 @@
+import re
+from functools import lru_cache
+
+# A run of digits, allowing a few spaces/dashes between them ("4111 1111-1111  1111").
+# Every repetition has to consume a digit, so this can't backtrack badly.
+_DIGIT_RUN = re.compile(r'[0-9](?:[ -]{0,3}[0-9])*')
+_DIGITS = re.compile(r'[0-9]+')
+
+MIN_DIGITS = 13
+
+# (brand, IIN prefix ranges, allowed lengths)
+CARD_BRANDS = (
+    ("VISA", ((4, 4),), (13, 16, 19)),
+    ("MASTERCARD", ((51, 55), (2221, 2720)), (16,)),
+    ("AMEX", ((34, 34), (37, 37)), (15,)),
+    ("DISCOVER", ((6011, 6011), (644, 649), (65, 65)), (16, 19)),
+    ("JCB", ((3528, 3589),), (16, 17, 18, 19)),
+    ("DINERS", ((300, 305), (36, 36), (38, 39)), (14, 16, 19)),
+    ("UNIONPAY", ((62, 62),), (16, 17, 18, 19)),
+    ("MAESTRO", ((50, 50), (56, 58), (67, 67)), (13, 14, 15, 16, 17, 18, 19)),
+)
+
+# Luhn value of a doubled digit
+_DOUBLED = {str(d): (2 * d if d < 5 else 2 * d - 9) for d in range(10)}
+
+def luhn_valid(digits):
+    total = sum(map(int, digits[-1::-2])) + sum(map(_DOUBLED.__getitem__, digits[-2::-2]))
+    return total % 10 == 0
+
+@lru_cache(maxsize=None)
+def card_lengths(prefix):
+    """Lengths a card starting with these 4 digits may have, longest first."""
+    lengths = set()
+    for brand, ranges, allowed in CARD_BRANDS:
+        for low, high in ranges:
+            if low <= int(prefix[:len(str(low))]) <= high:
+                lengths.update(allowed)
+    return tuple(sorted(lengths, reverse=True))
+
+def card_brand(digits):
+    """Returns the card network for a digit string, or None if no known IIN/length fits."""
+    for brand, ranges, lengths in CARD_BRANDS:
+        if len(digits) not in lengths:
+            continue
+        for low, high in ranges:
+            if low <= int(digits[:len(str(low))]) <= high:
+                return brand
+    return None
+
+def is_card_number(digits):
+    return card_brand(digits) is not None and luhn_valid(digits)
+
+def find_card_numbers(text, pos=0):
+    """
+    Yields (start, end) for every payment card number in text[pos:].
+    Runs in linear time: digit runs are found with a regex that can't backtrack badly,
+    then each run is split into digit groups. From every group, only the few windows
+    whose length fits the card network of their first digits are checked (IIN + Luhn).
+    """
+    for run in _DIGIT_RUN.finditer(text, pos):
+        start, end = run.span()
+        # Same rule as \b: not glued to letters, digits or underscores
+        if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+            continue
+        if end < len(text) and (text[end].isalnum() or text[end] == '_'):
+            continue
+
+        groups = [g.span() for g in _DIGITS.finditer(text, start, end)]
+        digits = "".join(text[s:e] for s, e in groups)
+        # Digit count before each group -> group index, to find windows of a given length
+        offsets = []
+        count = 0
+        for s, e in groups:
+            offsets.append(count)
+            count += e - s
+        group_at = {offset: i for i, offset in enumerate(offsets)}
+        group_at[count] = len(groups)
+
+        i = 0
+        while i < len(groups):
+            first = offsets[i]
+            if count - first < MIN_DIGITS:
+                break
+            found = None
+            # Longest valid window wins
+            for length in card_lengths(digits[first:first + 4]):
+                j = group_at.get(first + length)
+                if j is not None and luhn_valid(digits[first:first + length]):
+                    found = j
+                    break
+            if found is None:
+                i += 1
+                continue
+            yield groups[i][0], groups[found - 1][1]
+            i = found
@@ -12,6 +12,9 @@ def show_menu(monitor, args, monitor_started=False, clear_screen_on_start=True):
     first_run = True
 
     while True:
+        # Log lines are written on a background thread; let them land before the menu
+        logger.flush()
+
         # Clear screen and show logo each time to create a "static" UI feel
         if first_run and not clear_screen_on_start:
              pass # Skip first clear to keep startup logs visible
@@ -67,6 +70,22 @@ def show_menu(monitor, args, monitor_started=False, clear_screen_on_start=True):
             print("\n--- Monitored Directories ---")
             for p in monitor.watch_paths:
                 print(f" - {p}")
+            stats = monitor.executor.stats()
+            print(f"\nScan queue: {stats['queued']} waiting, {stats['active']} active, "
+                  f"{stats['completed']} done (peak {stats['max_depth']})")
+            gate = monitor.detector.ner_gate.stats()
+            print(f"NLP pre-filter: skipped {gate['skipped']} of {gate['checked']} texts")
+            state = 'loading' if monitor.detector.ner_loading else 'ready' if monitor.detector.ner_ready else 'unavailable'
+            print(f"NLP model: {state}")
+            cache = monitor.result_cache.stats()
+            print(f"Result cache: {cache['entries']} contents, {cache['hits']} rescans avoided")
+            if monitor.documents:
+                docs = monitor.documents.stats()
+                print(f"Documents: {docs['extracted']} extracted, {docs['hits']} re-extractions avoided, "
+                      f"{docs['timeouts']} timed out")
+            dedup = logger.dedup_stats()
+            print(f"Alert dedup: {dedup['size']} remembered, {dedup['hits']} repeats suppressed, "
+                  f"{dedup['expired'] + dedup['evicted']} evicted")
             input("\nPress Enter to return to menu...")
             
         elif choice == '4':
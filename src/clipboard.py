@@ -0,0 +1,222 @@
+import sys
+import time
+import select
+import ctypes
+import ctypes.util
+import threading
+import pyperclip
+from .logger import logger
+
+# Every backend's first wait_for_change() reports the text already on the clipboard,
+# so it is scanned when monitoring starts, like a fresh copy.
+
+class PollingClipboard:
+    """
+    Fallback backend: reads the clipboard with pyperclip on a timer.
+    The interval starts at min_interval after a change and doubles up to
+    max_interval while nothing happens, so an idle clipboard costs few reads
+    (on Linux each read is an xclip/xsel process).
+    """
+    name = "polling"
+
+    def __init__(self, min_interval=0.25, max_interval=2.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        # Only the hash of the last text is kept, not the text
+        self.last_hash = None
+        self.text = None
+        self.last_read = 0.0
+        self.reads = 0
+
+    def wait_for_change(self, timeout):
+        """Blocks up to `timeout` seconds; True if the clipboard changed (read() has the text)."""
+        # The caller's timeout is only how often it looks at its stop flag; reads follow our interval
+        wait = self.last_read + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        self.last_read = time.monotonic()
+        self.reads += 1
+        text = pyperclip.paste()
+        h = hash(text)
+        if h == self.last_hash:
+            self.interval = min(self.interval * 2, self.max_interval)
+            return False
+        self.last_hash = h
+        self.interval = self.min_interval
+        self.text = text
+        return True
+
+    def read(self):
+        text, self.text = self.text, None
+        return text if text is not None else pyperclip.paste()
+
+    def close(self):
+        pass
+
+class CounterClipboard:
+    """
+    Backend for systems that keep a clipboard change counter (Windows sequence number,
+    macOS pasteboard changeCount). Checking the counter is a cheap call that never
+    reads the clipboard; the text is only fetched after it moved.
+    """
+    def __init__(self, name, counter, check_interval=0.1):
+        self.name = name
+        self.counter = counter
+        self.check_interval = check_interval
+        # No count yet: the first check reports what is already on the clipboard
+        self.last_count = None
+
+    def wait_for_change(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            count = self.counter()
+            if count != self.last_count:
+                self.last_count = count
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.check_interval, remaining))
+
+    def read(self):
+        return pyperclip.paste()
+
+    def close(self):
+        pass
+
+class XFixesClipboard:
+    """
+    X11 backend: the XFixes extension sends an event whenever the CLIPBOARD selection
+    changes owner (i.e. something was copied), so we sleep on the X connection
+    instead of polling. Raises OSError if there is no X display or no XFixes.
+    """
+    name = "xfixes"
+
+    # XFixesSetSelectionOwnerNotifyMask | SelectionWindowDestroyNotifyMask | SelectionClientCloseNotifyMask
+    NOTIFY_MASK = 1 | 2 | 4
+    # XFixesSelectionNotify, relative to the extension's event base
+    SELECTION_NOTIFY = 0
+
+    def __init__(self):
+        x11_path = ctypes.util.find_library("X11")
+        xfixes_path = ctypes.util.find_library("Xfixes")
+        if not x11_path or not xfixes_path:
+            raise OSError("libX11/libXfixes not found")
+        x11 = ctypes.cdll.LoadLibrary(x11_path)
+        xfixes = ctypes.cdll.LoadLibrary(xfixes_path)
+
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        x11.XInternAtom.restype = ctypes.c_ulong
+        x11.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        x11.XPending.argtypes = [ctypes.c_void_p]
+        x11.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        x11.XFlush.argtypes = [ctypes.c_void_p]
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xfixes.XFixesQueryExtension.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int),
+                                                ctypes.POINTER(ctypes.c_int)]
+        xfixes.XFixesSelectSelectionInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong,
+                                                      ctypes.c_ulong, ctypes.c_ulong]
+
+        display = x11.XOpenDisplay(None)
+        if not display:
+            raise OSError("cannot open X display")
+        event_base = ctypes.c_int()
+        error_base = ctypes.c_int()
+        if not xfixes.XFixesQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            x11.XCloseDisplay(display)
+            raise OSError("X server has no XFixes extension")
+
+        clipboard = x11.XInternAtom(display, b"CLIPBOARD", 0)
+        xfixes.XFixesSelectSelectionInput(display, x11.XDefaultRootWindow(display), clipboard,
+                                          self.NOTIFY_MASK)
+        x11.XFlush(display)
+
+        self.x11 = x11
+        self.display = display
+        self.fd = x11.XConnectionNumber(display)
+        self.notify_type = event_base.value + self.SELECTION_NOTIFY
+        # XEvent is a union padded to 24 longs
+        self.event = (ctypes.c_long * 24)()
+        # What was copied before monitoring started counts as the first change
+        self.started = False
+
+    def wait_for_change(self, timeout):
+        if not self.started:
+            self.started = True
+            return True
+        if not self.x11.XPending(self.display):
+            select.select([self.fd], [], [], timeout)
+        changed = False
+        while self.x11.XPending(self.display):
+            self.x11.XNextEvent(self.display, self.event)
+            if ctypes.c_int.from_buffer(self.event).value == self.notify_type:
+                changed = True
+        return changed
+
+    def read(self):
+        return pyperclip.paste()
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+class FakeClipboard:
+    """In-memory clipboard for tests: copy() plays the part of the user."""
+    name = "fake"
+
+    def __init__(self, text=""):
+        self.text = text
+        self.changed = threading.Event()
+        self.reads = 0
+        # Like the real backends, text already there is reported first
+        if text:
+            self.changed.set()
+
+    def copy(self, text):
+        self.text = text
+        self.changed.set()
+
+    def wait_for_change(self, timeout):
+        if not self.changed.wait(timeout):
+            return False
+        self.changed.clear()
+        return True
+
+    def read(self):
+        self.reads += 1
+        return self.text
+
+    def close(self):
+        pass
+
+def _windows_sequence():
+    return ctypes.windll.user32.GetClipboardSequenceNumber()
+
+def _macos_change_count():
+    from AppKit import NSPasteboard
+    pasteboard = NSPasteboard.generalPasteboard()
+    return lambda: pasteboard.changeCount()
+
+def create_clipboard_backend(interval=1.0):
+    """
+    Picks the best change-notification backend for this platform, falling back
+    to adaptive polling (between interval/4 and interval*2 seconds).
+    """
+    try:
+        if sys.platform == "win32":
+            return CounterClipboard("windows", _windows_sequence)
+        if sys.platform == "darwin":
+            return CounterClipboard("macos", _macos_change_count())
+        return XFixesClipboard()
+    except Exception as e:
+        logger.info(f"Clipboard change notifications unavailable ({e}), polling instead.")
+    return PollingClipboard(min_interval=interval / 4, max_interval=interval * 2)
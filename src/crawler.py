@@ -0,0 +1,174 @@
+import os
+import queue
+import threading
+
+# DirEntry.stat() on Windows leaves st_ino at 0, but the scan index compares
+# inodes from os.stat(), so there the full stat call is needed
+ENTRY_STAT_HAS_INODE = os.name != 'nt'
+
+class Crawler:
+    """
+    Parallel directory walker for the initial scan.
+    Built on os.scandir: excluded directories are pruned before anything
+    inside them is listed, files are filtered on the entry path, and only the
+    files that pass are stat'ed. Several threads list directories at once
+    (listing and stat release the GIL), and results stream out while the crawl
+    is still running.
+    """
+    def __init__(self, path_filter, workers=8, max_pending=10000):
+        # The PathFilter the event handler uses too
+        self.path_filter = path_filter
+        self.workers = workers
+        self.max_pending = max_pending
+
+        self.lock = threading.Lock()
+        self.dirs_listed = 0
+        self.dirs_pruned = 0
+        self.files_seen = 0
+
+    def crawl(self, roots):
+        """Yields (path, stat) for every wanted file under the roots."""
+        dirs = queue.Queue()
+        # Bounded, so a slow consumer holds the crawl back instead of buffering everything
+        found = queue.Queue(maxsize=self.max_pending)
+        state = {"pending": 0}
+        lock = threading.Lock()
+        done = object()
+        # Set when the caller stops iterating early
+        stopped = threading.Event()
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    found.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def add_dir(path):
+            with lock:
+                state["pending"] += 1
+            dirs.put(path)
+
+        def worker():
+            while True:
+                path = dirs.get()
+                if path is None:
+                    return
+                try:
+                    if not stopped.is_set():
+                        self._list(path, add_dir, put)
+                finally:
+                    with lock:
+                        state["pending"] -= 1
+                        last = state["pending"] == 0
+                    if last:
+                        put(done)
+
+        for root in roots:
+            add_dir(root)
+        if not state["pending"]:
+            return
+
+        threads = [threading.Thread(target=worker, name=f"Crawler-{i}", daemon=True)
+                   for i in range(self.workers)]
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                item = found.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            stopped.set()
+            for _ in threads:
+                dirs.put(None)
+
+    def _list(self, path, add_dir, put):
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            return
+        path_filter = self.path_filter
+        pruned = seen = 0
+        with entries:
+            for entry in entries:
+                try:
+                    # Same as os.walk: don't follow links to directories.
+                    # Folders above were already let through, so only the entry itself is checked.
+                    if entry.is_dir(follow_symlinks=False):
+                        if path_filter.check_dir(entry.path, parents_checked=True) is None:
+                            add_dir(entry.path)
+                        else:
+                            pruned += 1
+                    elif path_filter.check(entry.path, parents_checked=True) is None and entry.is_file():
+                        st = entry.stat() if ENTRY_STAT_HAS_INODE else os.stat(entry.path)
+                        if path_filter.check_size(st.st_size) is None:
+                            seen += 1
+                            put((entry.path, st))
+                except OSError:
+                    # Vanished or unreadable entry
+                    continue
+        with self.lock:
+            self.dirs_listed += 1
+            self.dirs_pruned += pruned
+            self.files_seen += seen
+
+def make_tree(root, files=1_000_000, files_per_dir=100, ignored_share=0.5):
+    """
+    Builds a synthetic tree for benchmarks: `files` empty files, about
+    `ignored_share` of them under .git / __pycache__ / .venv / .vscode.
+    """
+    import random
+    random.seed(0)
+    ignored = (".git", "__pycache__", ".venv", ".vscode")
+    extensions = (".txt", ".csv", ".py", ".js", ".png", ".log", ".json", ".o")
+    made = 0
+    d = 0
+    while made < files:
+        if random.random() < ignored_share:
+            folder = os.path.join(root, f"project{d % 50}", random.choice(ignored), f"d{d}")
+        else:
+            folder = os.path.join(root, f"project{d % 50}", "data", f"d{d}")
+        os.makedirs(folder, exist_ok=True)
+        for i in range(min(files_per_dir, files - made)):
+            open(os.path.join(folder, f"f{i}{random.choice(extensions)}"), "w").close()
+        made += files_per_dir
+        d += 1
+
+def benchmark(root, workers=8):
+    """Times an os.walk + per-file filter loop against the crawler on a tree."""
+    import time
+    from .path_filter import PathFilter
+
+    path_filter = PathFilter()
+
+    start = time.perf_counter()
+    old = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            file_path = os.path.join(dirpath, name)
+            if path_filter.check(file_path) is None:
+                os.stat(file_path)
+                old += 1
+    walk_time = time.perf_counter() - start
+
+    for n in sorted({1, workers}):
+        crawler = Crawler(path_filter, workers=n)
+        start = time.perf_counter()
+        new = sum(1 for _ in crawler.crawl([root]))
+        took = time.perf_counter() - start
+        print(f"crawler, {n} thread(s): {took:.2f}s, {new} files "
+              f"({crawler.dirs_listed} dirs listed, {crawler.dirs_pruned} pruned)")
+    print(f"os.walk + filter: {walk_time:.2f}s, {old} files")
+
+if __name__ == "__main__":
+    # python -m src.crawler /tmp/tree [files]  (builds the tree first if it doesn't exist)
+    import sys
+    tree = sys.argv[1] if len(sys.argv) > 1 else "crawl_bench_tree"
+    if not os.path.exists(tree):
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+        print(f"Creating {count} files in {tree}...")
+        make_tree(tree, count)
+    benchmark(tree)
@@ -1,68 +1,434 @@
 import re
+import codecs
+import hashlib
+import threading
 import spacy
 from .logger import logger
+from .prefilter import NERGate
+from .matcher import RuleMatcher
+from .card_scanner import find_card_numbers
+from .keywords import KeywordDictionary
+from .sniffer import decode_errors
+
+# Interested in specific entities
+TARGET_ENTS = ("PERSON", "ORG", "GPE", "MONEY")
+
+# Bump when scanning logic changes in a way the rule set itself doesn't show.
+# Stored scan results (see scan_index.py) are invalidated by it.
+DETECTOR_VERSION = "3"
+
+# Pipeline components we never read from (only doc.ents is used), skipped at load time
+NER_EXCLUDE = ["tagger", "parser", "lemmatizer", "attribute_ruler", "senter"]
+
+# Longest piece of text handed to spacy in one call (its max_length is 1,000,000)
+NER_SEGMENT_CHARS = 100_000
+
+# Built-in Regex rules, used unless a custom rule set is given
+DEFAULT_PATTERNS = {
+    "EMAIL": re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
+    "SSN": re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
+    # Basic keyword storage (can be expanded)
+    "CONFIDENTIAL": re.compile(r'\b(confidential|private|secret|restricted)\b', re.IGNORECASE)
+}
+
+# Rules that need more than a regex: scanner(text, pos) yields (start, end) spans
+DEFAULT_SCANNERS = {
+    # Linear time, checks the card network prefix and the Luhn checksum
+    "CREDIT_CARD": find_card_numbers,
+}
+
+# Bytes that aren't valid UTF-8 are kept as lone surrogates while streaming so offsets stay exact
+_SURROGATES = re.compile('[\udc80-\udcff]')
+
+# Models already loaded in this process, shared by every detector
+_models = {}
+_models_lock = threading.Lock()
 
 class PII_Detector:
-    def __init__(self, model_name="en_core_web_sm"):
-        logger.info(f"Loading NLP model: {model_name}...")
-        try:
-            self.nlp = spacy.load(model_name)
-            logger.info("NLP model loaded successfully.")
-        except OSError:
-            logger.warning(f"Model '{model_name}' not found. Downloading...")
-            from spacy.cli import download
-            download(model_name)
-            self.nlp = spacy.load(model_name)
-            logger.info("NLP model downloaded and loaded.")
+    def __init__(self, model_name="en_core_web_sm", patterns=None, regex_backend=None, scanners=None,
+                 lazy=False):
+        self.model_name = model_name
+        self.nlp_lock = threading.Lock()
+        # Optional NERProcessPool (see executor.py) so NER isn't capped by the GIL
+        self.ner_pool = None
+        # Skips NER on texts that can't contain the entities we look for
+        self.ner_gate = NERGate()
+
+        # With lazy=True the model loads in the background; until then only Regex runs
+        self.nlp = None
+        self.model_ready = threading.Event()
+        # Set for good if the model can't be loaded: results are Regex only from then on
+        self.ner_unavailable = False
+        self.ready_listeners = []
+        self.ready_lock = threading.Lock()
 
         # Compile basic regex patterns for speed
-        self.patterns = {
-            "EMAIL": re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'),
-            "SSN": re.compile(r'\b\d{3}-\d{2}-\d{4}\b'),
-            "CREDIT_CARD": re.compile(r'\b(?:\d[ -]*?){13,16}\b'),
-            # Basic keyword storage (can be expanded)
-            "CONFIDENTIAL": re.compile(r'\b(confidential|private|secret|restricted)\b', re.IGNORECASE)
-        }
+        self.regex_backend = regex_backend
+        self.set_patterns(patterns if patterns is not None else DEFAULT_PATTERNS)
+        self.scanners = dict(scanners if scanners is not None else DEFAULT_SCANNERS)
+        # Called when the rules change at runtime (e.g. a keyword list was reloaded,
+        # or the NLP model turned out to be unavailable)
+        self.rules_listeners = []
+
+        if lazy:
+            threading.Thread(target=self._load_model, name="NLPLoader", daemon=True).start()
+        else:
+            self._load_model(background=False)
+
+    def set_patterns(self, patterns):
+        """Replaces the Regex rules. Values can be compiled patterns or plain strings."""
+        self.patterns = {label: re.compile(p) if isinstance(p, str) else p
+                         for label, p in patterns.items()}
+        # One pass over the text tells which rules need to run (see matcher.py)
+        self.matcher = RuleMatcher(self.patterns, backend=self.regex_backend)
+
+    def add_rule(self, label, pattern, flags=0):
+        rules = dict(self.patterns)
+        rules[label] = re.compile(pattern, flags)
+        self.set_patterns(rules)
+
+    def _load_model(self, background=True):
+        try:
+            nlp = get_shared_model(self.model_name)
+        except (Exception, SystemExit) as e:
+            # SystemExit: spacy's CLI code exits instead of raising; it must not kill this thread silently
+            if not background:
+                raise
+            logger.error(f"NLP model unavailable, continuing with Regex only: {e}")
+            with self.ready_lock:
+                self.ner_unavailable = True
+                self.ready_listeners = []
+            # NER is gone from the rule set, so version() changed
+            self._rules_changed()
+            return
+
+        with self.ready_lock:
+            self.nlp = nlp
+            self.model_ready.set()
+            listeners = list(self.ready_listeners)
+        for callback in listeners:
+            callback()
+
+    @property
+    def ner_ready(self):
+        return self.model_ready.is_set()
+
+    @property
+    def ner_loading(self):
+        """True while NER findings may still follow for texts scanned now."""
+        return not self.model_ready.is_set() and not self.ner_unavailable
+
+    def on_ready(self, callback):
+        """Calls back once the NLP model is loaded (right away if it already is, never if it can't be)."""
+        with self.ready_lock:
+            if self.ner_unavailable:
+                return
+            if not self.model_ready.is_set():
+                self.ready_listeners.append(callback)
+                return
+        callback()
+
+    def wait_until_ready(self, timeout=None):
+        return self.model_ready.wait(timeout)
+
+    def add_keyword_list(self, path, label="KEYWORD", case_sensitive=False, whole_words=True):
+        """Adds a dictionary of terms (one per line) matched with an Aho-Corasick automaton."""
+        keywords = KeywordDictionary(path, case_sensitive=case_sensitive, whole_words=whole_words)
+        self.scanners[label] = keywords
+        keywords.listeners.append(self._rules_changed)
+        self._rules_changed()
+        return keywords
+
+    def _rules_changed(self):
+        for callback in self.rules_listeners:
+            callback()
+
+    def version(self, ner=None):
+        """
+        Fingerprint of the active rules. Cached results are only reused while it matches.
+        ner=False: the same rules without NER (the default once the model is unavailable).
+        """
+        if ner is None:
+            ner = not self.ner_unavailable
+        h = hashlib.blake2b(digest_size=8)
+        if ner:
+            h.update(f"{DETECTOR_VERSION}:{self.model_name}:{','.join(TARGET_ENTS)}:{self.ner_gate.config()}".encode())
+        else:
+            h.update(f"{DETECTOR_VERSION}:regex-only".encode())
+        for label, pattern in sorted(self.patterns.items()):
+            h.update(f"{label}:{pattern.pattern}:{pattern.flags}".encode())
+        for label, scanner in sorted(self.scanners.items(), key=lambda item: item[0]):
+            name = getattr(scanner, "version", None)
+            if not name:
+                # Plain function, or an object without a version of its own
+                kind = scanner if hasattr(scanner, "__qualname__") else type(scanner)
+                name = f"{kind.__module__}.{kind.__qualname__}"
+            h.update(f"{label}:{name}".encode())
+        return h.hexdigest()
 
     def scan_text(self, text):
         """
         Scans text for PII and sensitive content.
         Returns a list of dictionaries with detected info.
         """
-        matches = []
-        
         if not text:
-            return matches
+            return []
+
+        return self.scan_regex(text) + self.scan_ner(text)
+
+    def scan_regex(self, text):
+        """Runs the strict Regex rules only. Cheap enough to run on any thread."""
+        return [m for _, m in self._regex_matches(text)]
 
-        # 1. Regex Scanning
-        for label, pattern in self.patterns.items():
-            for match in pattern.finditer(text):
-                matches.append({
+    def _regex_matches(self, text, pos=0, cutoff=None):
+        """Yields (start, match) for every rule, skipping matches that start at or after `cutoff`."""
+        for label, pattern in self.matcher.rules_for(text):
+            for match in pattern.finditer(text, pos):
+                if cutoff is not None and match.start() >= cutoff:
+                    break
+                yield match.start(), {
                     "type": label,
                     "value": match.group(),
                     "method": "Regex"
-                })
-
-        # 2. NLP Context Scanning (NER)
-        # We process the text with Spacy to find Named Entities
-        doc = self.nlp(text)
-        
-        # Interested in specific entities
-        target_ents = ["PERSON", "ORG", "GPE", "MONEY"]
-        
-        for ent in doc.ents:
-            if ent.label_ in target_ents:
-                # We can add a filter here to reduce noise. 
-                # For now, we report them but maybe we only want them if they appear near sensitive keywords?
-                # Simple implementation: Report all ORG/PERSON as potential PI
-                matches.append({
-                    "type": ent.label_,
-                    "value": ent.text,
-                    "method": "NLP(NER)"
-                })
+                }
 
+        for label, scanner in self.scanners.items():
+            for start, end in scanner(text, pos):
+                if cutoff is not None and start >= cutoff:
+                    break
+                yield start, {
+                    "type": label,
+                    "value": text[start:end],
+                    "method": "Regex"
+                }
+
+    def scan_ner(self, text, offsets=False):
+        """
+        Runs the NLP Context Scanning (NER), in the process pool if one is attached.
+        Returns nothing while the model is still loading (see ner_ready).
+        """
+        if not text or not self.ner_ready:
+            return []
+
+        matches = []
+        # Long texts are fed in pieces so spacy's max_length is never hit
+        for start, piece in split_segments(text, NER_SEGMENT_CHARS):
+            if not self.ner_gate.allows(piece):
+                continue
+            if self.ner_pool is not None:
+                found = self.ner_pool.extract(piece, offsets)
+            else:
+                # A single Language object is shared by every scan thread
+                with self.nlp_lock:
+                    found = extract_entities(self.nlp, piece, offsets)
+            if offsets:
+                for m in found:
+                    m["start"] += start
+            matches.extend(found)
         return matches
 
+    def scan_many(self, texts, batch_size=32, n_process=1):
+        """
+        Scans several texts at once and returns one match list per text.
+        NER goes through nlp.pipe in batches, which is much faster than one call per text.
+        """
+        results = [self.scan_regex(text) if text else [] for text in texts]
+        for matches, found in zip(results, self.scan_many_ner(texts, batch_size, n_process)):
+            matches.extend(found)
+        return results
+
+    def scan_many_ner(self, texts, batch_size=32, n_process=1):
+        """NER part of scan_many: one entity list per text."""
+        results = [[] for _ in texts]
+        if not self.ner_ready:
+            return results
+
+        pieces = []
+        owners = []
+        for i, text in enumerate(texts):
+            for _, piece in split_segments(text or "", NER_SEGMENT_CHARS):
+                if not self.ner_gate.allows(piece):
+                    continue
+                pieces.append(piece)
+                owners.append(i)
+        if not pieces:
+            return results
+
+        if self.ner_pool is not None:
+            found = self.ner_pool.extract_many(pieces)
+        else:
+            with self.nlp_lock:
+                docs = self.nlp.pipe(pieces, batch_size=batch_size, n_process=n_process)
+                found = [entities_from_doc(doc) for doc in docs]
+
+        for i, matches in zip(owners, found):
+            results[i].extend(matches)
+        return results
+
+    def scan_stream(self, stream, chunk_size=1024 * 1024, overlap=4096, hasher=None, start=0, limit=None,
+                    regex=True, encoding='utf-8'):
+        """
+        Scans a binary stream chunk by chunk and yields matches as they are found.
+        Each match has the byte "offset" where it starts in the stream (counting from
+        `start`, the position the stream was already at). At most `limit` bytes are read.
+        Windows overlap by `overlap` characters so a match cut by a chunk boundary
+        is still found (once). Memory use depends on chunk_size, not on the file size.
+        With regex=False only NER findings are produced. `encoding` comes from
+        sniffer.sniff(); offsets are counted in that encoding's bytes.
+        """
+        errors = decode_errors(encoding)
+        decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        carry = ""          # Tail of the previous window that wasn't scanned to the end yet
+        carry_offset = start    # Byte offset of carry[0]
+        context = ""        # Character just before carry, so \b works at the window start
+        ner_buffer = ""     # Scanned text waiting for a line end before it goes to NER
+        ner_offset = start
+        char_pos = 0        # Character position of carry[0] in the whole stream
+        # Rule -> character position where its last reported match ended. A match that ran
+        # past the cutoff must not come back as pieces when the next window rescans its tail.
+        reported_end = {}
+
+        while True:
+            if limit is not None:
+                raw = stream.read(min(chunk_size, limit)) if limit > 0 else b""
+                limit -= len(raw)
+            else:
+                raw = stream.read(chunk_size)
+            final = not raw
+            if hasher is not None and raw:
+                hasher.update(raw)
+
+            window = context + carry + decoder.decode(raw, final=final)
+            base = len(context)
+            # A match starting in the last `overlap` chars may still grow; leave it for the next window
+            cutoff = len(window) if final else max(base, len(window) - overlap)
+
+            found = sorted(self._regex_matches(window, base, cutoff), key=lambda x: x[0]) if regex else []
+            origin = char_pos - base
+            kept = []
+            for pos, m in found:
+                if origin + pos < reported_end.get(m["type"], 0):
+                    continue
+                reported_end[m["type"]] = origin + pos + len(m["value"])
+                kept.append((pos, m))
+            found = kept
+            positions = [start for start, _ in found]
+            for offset, (_, m) in zip(byte_offsets(window, positions, base, carry_offset, encoding, errors), found):
+                m["value"] = _clean(m["value"])
+                m["offset"] = offset
+                yield m
+
+            committed = window[base:cutoff]
+            ner_buffer += committed
+            context = window[cutoff - 1:cutoff] if cutoff else ""
+            carry = window[cutoff:]
+            carry_offset += byte_len(committed, encoding, errors)
+            char_pos += len(committed)
+
+            # NER runs on whole lines, in batches of up to NER_SEGMENT_CHARS
+            if final or len(ner_buffer) >= NER_SEGMENT_CHARS:
+                split = len(ner_buffer) if final else ner_buffer.rfind('\n') + 1
+                if split <= 0:
+                    split = len(ner_buffer)
+                ready, ner_buffer = ner_buffer[:split], ner_buffer[split:]
+                found = self.scan_ner(_SURROGATES.sub('\ufffd', ready), offsets=True)
+                found.sort(key=lambda m: m["start"])
+                positions = [m["start"] for m in found]
+                for offset, m in zip(byte_offsets(ready, positions, 0, ner_offset, encoding, errors), found):
+                    del m["start"]
+                    m["offset"] = offset
+                    yield m
+                ner_offset += byte_len(ready, encoding, errors)
+
+            if final:
+                break
+
+def byte_len(text, encoding='utf-8', errors='surrogateescape'):
+    return len(text.encode(encoding, errors))
+
+def byte_offsets(text, positions, start=0, base=0, encoding='utf-8', errors='surrogateescape'):
+    """Converts sorted character positions in text[start:] to byte offsets (plus `base`)."""
+    offsets = []
+    last = start
+    for pos in positions:
+        base += byte_len(text[last:pos], encoding, errors)
+        last = pos
+        offsets.append(base)
+    return offsets
+
+def _clean(value):
+    # Undecodable bytes -> replacement char, safe to log
+    return value.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+
+def split_segments(text, max_chars):
+    """Yields (start, piece) with pieces of at most max_chars, cut at line ends when possible."""
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(start + max_chars, n)
+        if end < n:
+            nl = text.rfind('\n', start, end)
+            if nl > start:
+                end = nl + 1
+        yield start, text[start:end]
+        start = end
+
+def load_model(model_name):
+    """Loads a spacy model with only what NER needs."""
+    return spacy.load(model_name, exclude=NER_EXCLUDE)
+
+def get_shared_model(model_name):
+    """
+    Returns the process-wide copy of a model, loading (and downloading) it the first time.
+    Every detector in the process shares it instead of loading its own.
+    """
+    with _models_lock:
+        nlp = _models.get(model_name)
+        if nlp is not None:
+            return nlp
+
+        logger.info(f"Loading NLP model: {model_name}...")
+        try:
+            nlp = load_model(model_name)
+            logger.info("NLP model loaded successfully.")
+        except OSError:
+            logger.warning(f"Model '{model_name}' not found. Downloading...")
+            from spacy.cli import download
+            try:
+                download(model_name)
+            except SystemExit as e:
+                # Offline or behind a proxy, spacy's CLI calls sys.exit() instead of raising
+                raise OSError(f"Cannot download model '{model_name}' (exit code {e.code})") from None
+            nlp = load_model(model_name)
+            logger.info("NLP model downloaded and loaded.")
+
+        # First call allocates spacy's internal buffers; do it now rather than on the first file
+        nlp("Warm up run for John Smith in London.")
+        _models[model_name] = nlp
+        return nlp
+
+def extract_entities(nlp, text, offsets=False):
+    """Processes text with Spacy and returns the interesting Named Entities."""
+    return entities_from_doc(nlp(text), offsets)
+
+def entities_from_doc(doc, offsets=False):
+    matches = []
+    for ent in doc.ents:
+        if ent.label_ in TARGET_ENTS:
+            # We can add a filter here to reduce noise. 
+            # For now, we report them but maybe we only want them if they appear near sensitive keywords?
+            # Simple implementation: Report all ORG/PERSON as potential PI
+            match = {
+                "type": ent.label_,
+                "value": ent.text,
+                "method": "NLP(NER)"
+            }
+            if offsets:
+                match["start"] = ent.start_char
+            matches.append(match)
+
+    return matches
+
 if __name__ == "__main__":
     # Quick test
     detector = PII_Detector()
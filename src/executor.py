@@ -0,0 +1,215 @@
+import queue
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from .logger import logger
+from .detector import extract_entities, load_model
+from .extractors import ExtractionCache, document_key, extractor_for, run_extractor
+
+# Spacy model owned by a NER worker process (set by the pool initializer)
+_process_nlp = None
+
+def _init_ner_process(model_name):
+    global _process_nlp
+    _process_nlp = load_model(model_name)
+
+def _ner_in_process(text, offsets=False):
+    return extract_entities(_process_nlp, text, offsets)
+
+class NERProcessPool:
+    """
+    Runs spacy NER in separate processes so it is not capped by the GIL.
+    Each worker loads its own copy of the model when it starts.
+    """
+    def __init__(self, model_name, processes=2):
+        # Not forked from this (threaded) process: a child could inherit a lock held by another thread
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver") if "forkserver" in methods else None
+        self.pool = ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                        initializer=_init_ner_process, initargs=(model_name,))
+
+    def extract(self, text, offsets=False):
+        return self.pool.submit(_ner_in_process, text, offsets).result()
+
+    def extract_many(self, texts):
+        return list(self.pool.map(_ner_in_process, texts, chunksize=8))
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class TextExtractorPool:
+    """
+    Runs the document parsers in worker processes, so a slow or stuck parser never
+    holds up a scan thread for longer than `timeout` seconds of extraction (and never
+    the GIL). A worker that times out is killed and the pool replaced. Results are
+    cached by document_key(), so an unchanged re-save isn't parsed again.
+    """
+    def __init__(self, processes=2, timeout=30.0, cache=None):
+        self.processes = processes
+        self.timeout = timeout
+        self.cache = cache if cache is not None else ExtractionCache()
+        self.lock = threading.Lock()
+        # One document per worker: the rest wait here, so their timeout doesn't run while queued
+        self.slots = threading.BoundedSemaphore(processes)
+        self.pool = self._new_pool()
+
+        self.extracted = 0
+        self.timeouts = 0
+        self.failed = 0
+
+    def _new_pool(self):
+        # Not forked from this (threaded) process; forkserver where available
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver") if "forkserver" in methods else None
+        return ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+
+    def extract(self, path):
+        """Text of the document at `path`, or None if it couldn't be extracted in time."""
+        key = document_key(path)
+        text = self.cache.get(key)
+        if text is not None:
+            return text
+
+        for attempt in range(2):
+            with self.slots:
+                # Submitted under the lock so it never lands on a pool that _replace() shut down
+                with self.lock:
+                    pool = self.pool
+                    future = pool.submit(run_extractor, extractor_for(path), path)
+                try:
+                    # A worker is free, so the document is being extracted from now on
+                    text = future.result(timeout=self.timeout or None)
+                    break
+                except TimeoutError:
+                    self.timeouts += 1
+                    self._replace(pool)
+                    logger.warning(f"Text extraction timed out after {self.timeout}s: {path}")
+                    return None
+                except BrokenProcessPool:
+                    # Killed by another file's timeout, or a parser crashed: one retry
+                    self._replace(pool)
+                    if attempt:
+                        self.failed += 1
+                        logger.warning(f"Text extraction crashed: {path}")
+                        return None
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning(f"Cannot extract text from {path}: {e}")
+                    return None
+
+        self.extracted += 1
+        self.cache.put(key, text)
+        return text
+
+    def _replace(self, pool):
+        with self.lock:
+            if self.pool is not pool:
+                # Someone else already replaced it
+                return
+            self.pool = self._new_pool()
+        # A running task can't be cancelled, so its worker has to be killed
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        stats = {"extracted": self.extracted, "timeouts": self.timeouts, "failed": self.failed}
+        stats.update(self.cache.stats())
+        return stats
+
+    def shutdown(self):
+        with self.lock:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+class ScanExecutor:
+    """
+    Bounded pool of scan worker threads.
+    submit() blocks once `queue_size` jobs are waiting, so a burst of events
+    slows down intake instead of growing memory.
+    """
+    def __init__(self, workers=4, queue_size=1000):
+        self.workers = workers
+        self.jobs = queue.Queue(maxsize=queue_size)
+        self.threads = []
+        self.lock = threading.Lock()
+
+        # Counters for queue-depth reporting
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.throttled = 0
+
+    def start(self):
+        if self.threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"ScanWorker-{i}", daemon=True)
+            t.start()
+            self.threads.append(t)
+
+    def submit(self, fn, *args):
+        """Queues a scan job, waiting for a free slot if the queue is full."""
+        self.start()
+        try:
+            self.jobs.put_nowait((fn, args))
+        except queue.Full:
+            with self.lock:
+                self.throttled += 1
+                first = self.throttled == 1
+            if first:
+                logger.warning(f"Scan queue full ({self.jobs.maxsize} jobs), slowing down intake...")
+            self.jobs.put((fn, args))
+
+        depth = self.jobs.qsize()
+        with self.lock:
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def queue_depth(self):
+        return self.jobs.qsize()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "queued": self.jobs.qsize(),
+                "active": self.active,
+                "completed": self.completed,
+                "failed": self.failed,
+                "max_depth": self.max_depth,
+                "throttled": self.throttled,
+            }
+
+    def wait_idle(self):
+        """Blocks until every queued job has finished."""
+        self.jobs.join()
+
+    def shutdown(self):
+        for _ in self.threads:
+            self.jobs.put(None)
+        for t in self.threads:
+            t.join(timeout=1.0)
+        self.threads = []
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                self.jobs.task_done()
+                return
+
+            fn, args = job
+            with self.lock:
+                self.active += 1
+            try:
+                fn(*args)
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                logger.error(f"Scan worker error: {e}")
+            finally:
+                with self.lock:
+                    self.active -= 1
+                    self.completed += 1
+                self.jobs.task_done()
@@ -0,0 +1,218 @@
+import re
+import os
+import zipfile
+import threading
+from collections import OrderedDict
+from xml.etree.ElementTree import iterparse
+from .result_cache import content_hash, new_hasher
+
+# Optional PDF support (pip install pypdf)
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+# Extracted text beyond this is dropped (a giant spreadsheet shouldn't fill the memory)
+MAX_TEXT_CHARS = 20_000_000
+
+def _natural_key(name):
+    # slide2.xml before slide10.xml
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+def _members(zf, wanted):
+    return sorted((n for n in zf.namelist() if wanted(n)), key=_natural_key)
+
+def _local(tag):
+    # '{namespace}p' -> 'p'
+    return tag[tag.rfind('}') + 1:]
+
+def _xml_lines(stream, line_tags, text_tags=None):
+    """
+    Text of an XML part, one line per `line_tags` element (paragraph, row, ...).
+    With text_tags, only those elements' text is taken (Office runs); otherwise all
+    text inside the line element. Parsed incrementally, elements freed as we go.
+    """
+    out = []
+    parts = []
+    for _, elem in iterparse(stream, events=("end",)):
+        tag = _local(elem.tag)
+        if text_tags is not None:
+            if tag in text_tags:
+                parts.append(elem.text or "")
+            elif tag == "tab":
+                parts.append("\t")
+            elif tag in ("br", "cr"):
+                parts.append("\n")
+            if tag in line_tags:
+                out.append("".join(parts))
+                parts = []
+                elem.clear()
+        elif tag in line_tags:
+            out.append("".join(elem.itertext()))
+            elem.clear()
+    return out
+
+# --- Extractors: path -> text ---
+def _docx_part(name):
+    return re.fullmatch(r'word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml', name)
+
+def extract_docx(path):
+    lines = []
+    with zipfile.ZipFile(path) as zf:
+        for name in _members(zf, _docx_part):
+            with zf.open(name) as f:
+                lines.extend(_xml_lines(f, {"p"}, {"t"}))
+    return "\n".join(lines)
+
+def _pptx_part(name):
+    return re.fullmatch(r'ppt/(slides|notesSlides)/\w+\.xml', name)
+
+def extract_pptx(path):
+    lines = []
+    with zipfile.ZipFile(path) as zf:
+        for name in _members(zf, _pptx_part):
+            with zf.open(name) as f:
+                lines.extend(_xml_lines(f, {"p"}, {"t"}))
+    return "\n".join(lines)
+
+def _xlsx_part(name):
+    return name == 'xl/sharedStrings.xml' or re.fullmatch(r'xl/worksheets/\w+\.xml', name)
+
+def extract_xlsx(path):
+    """Cells row by row (tab separated), with shared strings resolved."""
+    lines = []
+    with zipfile.ZipFile(path) as zf:
+        shared = []
+        if 'xl/sharedStrings.xml' in zf.namelist():
+            with zf.open('xl/sharedStrings.xml') as f:
+                shared = _xml_lines(f, {"si"}, {"t"})
+        for name in _members(zf, lambda n: _xlsx_part(n) and n != 'xl/sharedStrings.xml'):
+            with zf.open(name) as f:
+                row = []
+                for _, elem in iterparse(f, events=("end",)):
+                    tag = _local(elem.tag)
+                    if tag == "c":
+                        kind = elem.get("t")
+                        value = None
+                        for child in elem:
+                            child_tag = _local(child.tag)
+                            if child_tag == "v":
+                                value = child.text or ""
+                            elif child_tag == "is":
+                                value = "".join(child.itertext())
+                        if value is not None:
+                            if kind == "s" and value.isdigit() and int(value) < len(shared):
+                                value = shared[int(value)]
+                            row.append(value)
+                        elem.clear()
+                    elif tag == "row":
+                        lines.append("\t".join(row))
+                        row = []
+                        elem.clear()
+    return "\n".join(lines)
+
+def _odf_part(name):
+    return name == 'content.xml'
+
+def extract_odf(path):
+    with zipfile.ZipFile(path) as zf:
+        with zf.open('content.xml') as f:
+            return "\n".join(_xml_lines(f, {"p", "h"}))
+
+def extract_pdf(path):
+    reader = pypdf.PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+# extension -> (extract(path) -> text, zip member filter or None).
+# The member filter names the parts the text comes from; only they go into the cache key.
+EXTRACTORS = {
+    '.docx': (extract_docx, _docx_part),
+    '.xlsx': (extract_xlsx, _xlsx_part),
+    '.pptx': (extract_pptx, _pptx_part),
+    '.odt': (extract_odf, _odf_part),
+    '.ods': (extract_odf, _odf_part),
+    '.odp': (extract_odf, _odf_part),
+}
+if pypdf is not None:
+    EXTRACTORS['.pdf'] = (extract_pdf, None)
+
+def register_extractor(ext, extract, members=None):
+    """
+    Adds a format. `extract(path)` must be a module-level function (it runs in a
+    worker process). For zip-based formats pass `members(name)` so the cache key
+    only covers the parts the text comes from.
+    """
+    EXTRACTORS[ext.lower()] = (extract, members)
+
+def document_extensions():
+    return tuple(EXTRACTORS)
+
+def extractor_for(path):
+    """The extract function for a path's format, or None."""
+    entry = EXTRACTORS.get(os.path.splitext(path)[1].lower())
+    return entry[0] if entry else None
+
+def is_document(path):
+    return os.path.splitext(path)[1].lower() in EXTRACTORS
+
+def document_key(path):
+    """
+    Content hash used as the extraction cache key. For zip-based formats it is built
+    from the CRC and size of the text parts in the zip directory (nothing is
+    decompressed), so re-saving a document with the same text gives the same key
+    even though metadata such as the modification date changed.
+    """
+    _, members = EXTRACTORS[os.path.splitext(path)[1].lower()]
+    if members is not None:
+        try:
+            with zipfile.ZipFile(path) as zf:
+                parts = sorted((i.filename, i.CRC, i.file_size) for i in zf.infolist() if members(i.filename))
+            return os.path.splitext(path)[1].lower() + ":" + content_hash(repr(parts))
+        except zipfile.BadZipFile:
+            pass
+    hasher = new_hasher()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def run_extractor(extract, path):
+    """Worker process entry point (the function travels by reference, so plugins work too)."""
+    return extract(path)[:MAX_TEXT_CHARS]
+
+class ExtractionCache:
+    """Extracted text by document_key(), LRU bounded by size."""
+    def __init__(self, max_chars=64 * 1024 * 1024):
+        self.max_chars = max_chars
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            text = self.entries.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key, text):
+        if len(text) > self.max_chars:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = text
+            self.size += len(text)
+            while self.size > self.max_chars:
+                _, old = self.entries.popitem(last=False)
+                self.size -= len(old)
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "chars": self.size,
+                    "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,192 @@
+import os
+import csv
+import json
+import time
+import sqlite3
+import logging
+import threading
+from .path_filter import APP_DIR
+
+# How long findings are kept, and how many at most (oldest go first)
+DEFAULT_MAX_AGE_DAYS = 90
+DEFAULT_MAX_ROWS = 1_000_000
+PRUNE_INTERVAL = 3600
+
+# Holds the detected values themselves, so it stays out of the (watched) working directory
+DEFAULT_DB_PATH = os.path.join(APP_DIR, "findings.db")
+
+COLUMNS = ("ts", "channel", "source", "path", "type", "method", "value", "offset")
+
+class FindingsStore:
+    """
+    Every logged detection as a row of an indexed SQLite table, so questions like
+    "all SSNs found on USB drives last week" are a query instead of a grep through
+    dlp_log.log. Rows older than max_age_days or beyond max_rows are pruned.
+    """
+    def __init__(self, db_path=DEFAULT_DB_PATH, max_age_days=DEFAULT_MAX_AGE_DAYS,
+                 max_rows=DEFAULT_MAX_ROWS):
+        self.db_path = db_path
+        self.max_age_days = max_age_days
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.last_prune = 0.0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS findings (
+                id INTEGER PRIMARY KEY,
+                ts REAL,
+                channel TEXT,
+                source TEXT,
+                path TEXT,
+                type TEXT,
+                method TEXT,
+                value TEXT,
+                offset INTEGER
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS findings_ts ON findings (ts)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS findings_type ON findings (type, ts)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS findings_channel ON findings (channel, ts)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS findings_path ON findings (path)")
+        self.conn.commit()
+        self.prune()
+
+    def add(self, source, matches, path=None, ts=None, channel=None):
+        """Stores one batch of matches from a source (committed by flush())."""
+        ts = ts or time.time()
+        if channel is None:
+            if path is not None:
+                channel = "usb" if source.startswith("USB") else "file"
+            else:
+                channel = source.lower()
+        rows = [(ts, channel, source, path, m['type'], m.get('method'), m['value'], m.get('offset'))
+                for m in matches]
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO findings (ts, channel, source, path, type, method, value, offset) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+        if time.time() - self.last_prune > PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self):
+        """Drops findings past the age or row limit."""
+        with self.lock:
+            if self.max_age_days:
+                self.conn.execute("DELETE FROM findings WHERE ts < ?",
+                                  (time.time() - self.max_age_days * 86400,))
+            if self.max_rows:
+                self.conn.execute(
+                    "DELETE FROM findings WHERE id <= (SELECT id FROM findings ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_rows,))
+            self.conn.commit()
+            self.last_prune = time.time()
+
+    def query(self, type=None, channel=None, path=None, since=None, until=None, limit=None):
+        """
+        Returns matching findings as dicts, newest first.
+        `path` matches a prefix (a folder or drive), since/until are timestamps.
+        """
+        where = []
+        args = []
+        if type:
+            where.append("type = ?")
+            args.append(type)
+        if channel:
+            where.append("channel = ?")
+            args.append(channel)
+        if path:
+            where.append("path >= ? AND path < ?")
+            args += [path, path + "\uffff"]
+        if since is not None:
+            where.append("ts >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            args.append(until)
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM findings"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            rows = self.conn.execute(sql, args).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def export(self, out, fmt="jsonl", **filters):
+        """Writes the findings matching `filters` (see query) to a text stream as JSONL or CSV."""
+        rows = self.query(**filters)
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                out.write(json.dumps(row) + "\n")
+        return len(rows)
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+class FindingsHandler(logging.Handler):
+    """
+    Log handler feeding the store. It runs on the log listener thread, so inserts
+    never slow down scanning, and commits once per batch of records.
+    """
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def emit(self, record):
+        matches = getattr(record, "findings", None)
+        if not matches:
+            return
+        try:
+            self.store.add(record.source, matches, getattr(record, "path", None), record.created,
+                           getattr(record, "category", None))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        self.store.flush()
+
+def parse_since(value):
+    """'7d', '12h', '30m' or a unix timestamp -> timestamp."""
+    units = {"d": 86400, "h": 3600, "m": 60}
+    if value[-1:] in units:
+        return time.time() - float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+if __name__ == "__main__":
+    # e.g. python -m src.findings_store --type SSN --channel usb --since 7d --format csv
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query or export stored findings")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--type", help="EMAIL, SSN, CREDIT_CARD, PERSON, ...")
+    parser.add_argument("--channel", choices=["file", "usb", "clipboard"])
+    parser.add_argument("--path", help="Only findings under this path")
+    parser.add_argument("--since", help="e.g. 7d, 12h, 30m or a unix timestamp")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    args = parser.parse_args()
+
+    store = FindingsStore(args.db)
+    start = time.perf_counter()
+    count = store.export(sys.stdout, fmt=args.format, type=args.type, channel=args.channel,
+                         path=args.path, since=parse_since(args.since) if args.since else None,
+                         limit=args.limit)
+    print(f"{count} findings in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
@@ -1,53 +1,252 @@
 
 import customtkinter as ctk
+import tkinter.font as tkfont
 import threading
 import sys
 import os
 import logging
 import re
+import time
 import queue
 from .monitor import SystemMonitor
-from .logger import logger
+from .logger import logger, CATEGORY_FILE, CATEGORY_USB, CATEGORY_CLIPBOARD, CATEGORY_STATUS
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
+# Only stripped if a message somehow carries color codes; records arrive uncolored
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
 class TextHandler(logging.Handler):
     """
     Queue-based logger for safe GUI updates.
+    The color tag comes from record.category (see logger.py), not from the text.
     """
+    CATEGORY_TAGS = {CATEGORY_USB: "USB", CATEGORY_CLIPBOARD: "CLIPBOARD"}
+
     def __init__(self, log_queue):
         super().__init__()
         self.log_queue = log_queue
+        # Messages lost because the GUI fell too far behind (the log file still has them)
+        self.dropped = 0
 
     def emit(self, record):
-        msg = self.format(record)
-        # Strip ANSI codes
-        ansi_escape = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-        clean_msg = ansi_escape.sub('', msg)
-        
-        # Determine color tag
-        tag = "INFO"
-        lower_msg = msg.lower()
-        if record.levelno >= logging.WARNING:
-            if "usb" in lower_msg or "external drive" in lower_msg:
-                tag = "USB"
-            elif "clipboard" in lower_msg:
-                tag = "CLIPBOARD"
-            else:
+        # Plain formatter: this handler never sees the console colors
+        clean_msg = self.format(record)
+        if '\x1b' in clean_msg:
+            clean_msg = ANSI_ESCAPE.sub('', clean_msg)
+
+        category = getattr(record, "category", None)
+        tag = self.CATEGORY_TAGS.get(category)
+        if tag is None:
+            if record.levelno >= logging.WARNING:
                 tag = "WARNING"
-        elif "starting" in lower_msg or "active" in lower_msg:
-            tag = "SUCCESS"
-        elif "monitor" in lower_msg or "enabled" in lower_msg or "disabled" in lower_msg:
-            # Capture all switch toggles (File/Clip/USB Enabled/Disabled)
-            if "usb" in lower_msg:
-                 tag = "USB"
-            elif "clipboard" in lower_msg:
-                 tag = "CLIPBOARD"
+            elif category is not None:
+                # Status and file monitor messages (started, enabled, ...)
+                tag = "SUCCESS"
             else:
-                 tag = "SUCCESS" # Green for generic/file monitor
-            
-        self.log_queue.put((clean_msg, tag))
+                tag = "INFO"
+
+        # Same level + message (ignoring the timestamp) counts as a repeat in the view
+        key = (record.levelno, record.getMessage())
+        try:
+            # Runs on the logger's writer thread, which must never block on the GUI
+            self.log_queue.put_nowait((clean_msg, tag, key))
+        except queue.Full:
+            self.dropped += 1
+
+class LogRing:
+    """
+    The last `capacity` log lines, for the GUI console. A line identical to the one
+    before it is collapsed into a repeat counter instead of taking a new slot.
+    Any line can be read by position, so the view only fetches what is on screen.
+    """
+    def __init__(self, capacity=100_000):
+        self.capacity = capacity
+        self.items = [None] * capacity
+        self.start = 0
+        self.count = 0
+        self.trimmed = 0     # Old lines pushed out of the buffer
+        self.collapsed = 0   # Repeats folded into the line before
+
+    def __len__(self):
+        return self.count
+
+    def append(self, text, tag, key):
+        if self.count:
+            last = self.items[(self.start + self.count - 1) % self.capacity]
+            if last[2] == key:
+                last[3] += 1
+                self.collapsed += 1
+                return
+        entry = [text, tag, key, 1]
+        if self.count < self.capacity:
+            self.items[(self.start + self.count) % self.capacity] = entry
+            self.count += 1
+        else:
+            # Full: overwrite the oldest line
+            self.items[self.start] = entry
+            self.start = (self.start + 1) % self.capacity
+            self.trimmed += 1
+
+    def lines(self, first, n):
+        """Up to n lines from position `first` (0 = oldest kept): [(text, tag, repeats)]."""
+        end = min(first + n, self.count)
+        out = []
+        for i in range(max(first, 0), end):
+            text, tag, _, repeats = self.items[(self.start + i) % self.capacity]
+            out.append((text, tag, repeats))
+        return out
+
+class LogView(ctk.CTkFrame):
+    """
+    Console that only renders the lines on screen. The text widget never holds more
+    than one screenful; scrolling just changes which slice of the LogRing is drawn,
+    so a flood of messages costs the same to display as a trickle.
+    """
+    def __init__(self, master, capacity=100_000, font=None, colors=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.ring = LogRing(capacity)
+        self.font = font or ctk.CTkFont(family="Consolas", size=12)
+        # Stick to the newest lines until the user scrolls up
+        self.follow = True
+        self.first = 0
+        self.rows = 1
+        self.dirty = True
+        self.shown_trimmed = 0
+        self.dropped = 0
+        # Line height of the font as actually drawn, per font spec (it changes with DPI scaling)
+        self.line_font = None
+        self.line_height = 1
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.text = ctk.CTkTextbox(self, activate_scrollbars=False, wrap="none", font=self.font)
+        self.text.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        # Lines aren't wrapped (one line per row keeps the virtualizing simple), so long
+        # paths and values are reached by scrolling sideways over the lines on screen
+        self.xscrollbar = ctk.CTkScrollbar(self, orientation="horizontal", command=self.text.xview)
+        self.xscrollbar.grid(row=1, column=0, sticky="ew")
+        self.text.configure(xscrollcommand=self.xscrollbar.set)
+        # "N messages dropped/collapsed", only shown once something was
+        self.status = ctk.CTkLabel(self, text="", text_color="gray", anchor="w",
+                                   font=ctk.CTkFont(size=11))
+
+        for tag, color in (colors or {}).items():
+            self.text.tag_config(tag, foreground=color)
+        self.text.configure(state="disabled")
+
+        self.text.bind("<Configure>", lambda e: self.mark_dirty())
+        self.text.bind("<MouseWheel>", self.on_wheel)
+        self.text.bind("<Button-4>", self.on_wheel)
+        self.text.bind("<Button-5>", self.on_wheel)
+        self.text.bind("<Shift-MouseWheel>", self.on_shift_wheel)
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def append(self, text, tag, key):
+        self.ring.append(text, tag, key)
+        if self.follow:
+            self.dirty = True
+
+    # --- Scrolling ---
+    def scroll_to(self, first):
+        last_page = max(0, len(self.ring) - self.rows)
+        self.first = max(0, min(int(first), last_page))
+        # Back at the bottom: follow new lines again
+        self.follow = self.first >= last_page
+        self.dirty = True
+        self.render()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(float(amount) * len(self.ring))
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 3
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first + delta * 3)
+        # Don't let the text widget scroll its own (single screen of) content
+        return "break"
+
+    def on_shift_wheel(self, event):
+        self.text.xview_scroll(-1 if event.delta > 0 else 1, "units")
+        return "break"
+
+    # --- Drawing ---
+    def render(self):
+        ring = self.ring
+        # Lines pushed out of the buffer shift what is at each position
+        if ring.trimmed != self.shown_trimmed:
+            if not self.follow:
+                self.first = max(0, self.first - (ring.trimmed - self.shown_trimmed))
+                self.dirty = True
+            self.shown_trimmed = ring.trimmed
+        self.update_status()
+        if not self.dirty:
+            return
+        self.dirty = False
+
+        self.rows = self.visible_rows()
+        if self.follow:
+            self.first = max(0, len(ring) - self.rows)
+
+        # Redrawing would jump back to the left edge
+        xview = self.text.xview()[0]
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        for text, tag, repeats in ring.lines(self.first, self.rows):
+            if repeats > 1:
+                text = f"{text}  (x{repeats})"
+            self.text.insert("end", text + "\n", tag)
+        self.text.configure(state="disabled")
+        self.text.xview_moveto(xview)
+
+        if len(ring):
+            self.scrollbar.set(self.first / len(ring), min(1.0, (self.first + self.rows) / len(ring)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def visible_rows(self):
+        """Whole lines that fit in the inner text widget, at the current DPI scaling."""
+        # customtkinter draws the font at size * scaling, and its outer frame adds
+        # border spacing and corner radius, so neither self.font nor the frame can be used
+        inner = self.text._textbox
+        font = inner.cget("font")
+        if font != self.line_font:
+            self.line_font = font
+            self.line_height = max(1, tkfont.Font(font=font).metrics("linespace"))
+        padding = 2 * sum(inner.winfo_pixels(inner.cget(option))
+                          for option in ("pady", "borderwidth", "highlightthickness"))
+        return max(1, (inner.winfo_height() - padding) // self.line_height)
+
+    def update_status(self):
+        parts = []
+        if self.dropped:
+            parts.append(f"{self.dropped} messages dropped")
+        if self.ring.collapsed:
+            parts.append(f"{self.ring.collapsed} repeats collapsed")
+        if self.ring.trimmed:
+            parts.append(f"{self.ring.trimmed} older lines trimmed (full log in dlp_log.log)")
+        text = "  |  ".join(parts)
+        if text == self.status.cget("text"):
+            return
+        self.status.configure(text=text)
+        if text:
+            self.status.grid(row=2, column=0, columnspan=2, sticky="ew", padx=5)
+        else:
+            self.status.grid_remove()
 
 class DLPApp(ctk.CTk):
     def __init__(self, monitor):
@@ -55,7 +254,8 @@ class DLPApp(ctk.CTk):
 
         self.monitor = monitor
         self.is_monitoring = False
-        self.log_queue = queue.Queue()
+        # Bounded: if the GUI can't keep up, messages are counted as dropped instead of piling up
+        self.log_queue = queue.Queue(maxsize=50_000)
 
         # Window Setup
         self.title("Zer0Leaks - Data Leakage Prevention")
@@ -128,15 +328,12 @@ class DLPApp(ctk.CTk):
         self.console_frame.grid_rowconfigure(0, weight=1)
         self.console_frame.grid_columnconfigure(0, weight=1)
 
-        self.log_box = ctk.CTkTextbox(self.console_frame, activate_scrollbars=True, font=ctk.CTkFont(family="Consolas", size=12))
+        # Keeps the last 100k lines but only draws the visible ones
+        self.log_box = LogView(self.console_frame, capacity=100_000, fg_color="transparent",
+                               font=ctk.CTkFont(family="Consolas", size=12),
+                               colors={"WARNING": "#FF5555", "USB": "#BD93F9", "CLIPBOARD": "#F1FA8C",
+                                       "SUCCESS": "#50FA7B", "INFO": "#F8F8F2"})
         self.log_box.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
-        
-        # Colors
-        self.log_box.tag_config("WARNING", foreground="#FF5555")
-        self.log_box.tag_config("USB", foreground="#BD93F9")
-        self.log_box.tag_config("CLIPBOARD", foreground="#F1FA8C")
-        self.log_box.tag_config("SUCCESS", foreground="#50FA7B")
-        self.log_box.tag_config("INFO", foreground="#F8F8F2")
 
         # ====================
         # 4. SLIDING DRAWER (Right Side)
@@ -162,8 +359,8 @@ class DLPApp(ctk.CTk):
 
 
         # Setup Internals
-        text_handler = TextHandler(self.log_queue)
-        logger.addHandler(text_handler)
+        self.text_handler = TextHandler(self.log_queue)
+        logger.addHandler(self.text_handler)
         
         self.process_logs_loop()
         self.check_status_loop()
@@ -207,7 +404,7 @@ class DLPApp(ctk.CTk):
                 self.is_monitoring = True
                 self.monitor_btn.configure(text="STOP MONITORING", fg_color="#FF5555", hover_color="#CC4444")
                 if self.switch_files_var.get() == "on" or self.clip_var.get() == "on":
-                    logger.info("System Monitors STARTED via GUI.")
+                    logger.info("System Monitors STARTED via GUI.", category=CATEGORY_STATUS)
                 else:
                     logger.warning("Monitoring Started, but no modules selected.")
             except Exception as e:
@@ -217,7 +414,7 @@ class DLPApp(ctk.CTk):
             self.monitor.running = False
             self.is_monitoring = False
             self.monitor_btn.configure(text="START MONITORING", fg_color="#2CC985", hover_color="#229966")
-            logger.info("System Monitors STOPPED via GUI.")
+            logger.info("System Monitors STOPPED via GUI.", category=CATEGORY_STATUS)
 
     def toggle_usb(self):
         if self.usb_var.get() == "on":
@@ -229,10 +426,10 @@ class DLPApp(ctk.CTk):
         if self.is_monitoring:
             if self.switch_files_var.get() == "on":
                 self.monitor.start_filesystem_monitor()
-                logger.info("File Monitor Enabled.")
+                logger.info("File Monitor Enabled.", category=CATEGORY_FILE)
             else:
                 self.monitor.stop_filesystem_monitor()
-                logger.info("File Monitor Disabled.")
+                logger.info("File Monitor Disabled.", category=CATEGORY_FILE)
 
     def toggle_clipboard_config(self):
         # Clipboard monitor loop checks 'self.monitor.running'. 
@@ -242,7 +439,7 @@ class DLPApp(ctk.CTk):
         if self.is_monitoring:
              if self.clip_var.get() == "off":
                  self.monitor.running = False # Stops the loop
-                 logger.info("Clipboard Monitor Disabled.")
+                 logger.info("Clipboard Monitor Disabled.", category=CATEGORY_CLIPBOARD)
              else:
                  # Restart if it was stopped
                  if not self.monitor.running:
@@ -251,7 +448,7 @@ class DLPApp(ctk.CTk):
                      # This is a simplification; handling thread restarts robustly needs more state checks
                      self.clipboard_thread = threading.Thread(target=self.monitor.start_clipboard_monitor, daemon=True)
                      self.clipboard_thread.start()
-                     logger.info("Clipboard Monitor Enabled.")
+                     logger.info("Clipboard Monitor Enabled.", category=CATEGORY_CLIPBOARD)
 
     # --- Menu Actions ---
     def add_dir_dialog(self):
@@ -277,23 +474,40 @@ class DLPApp(ctk.CTk):
              os.startfile(log_path) if os.name == 'nt' else None
 
     # --- Loops ---
-    def process_logs_loop(self):
-        """Batch process logs from Queue"""
-        if not self.log_queue.empty():
-            self.log_box.configure(state="normal")
-            for _ in range(50):
-                try:
-                    msg, tag = self.log_queue.get_nowait()
-                    self.log_box.insert("end", msg + "\n", tag)
-                except queue.Empty:
+    def process_logs_loop(self, budget=0.03):
+        """
+        Moves queued log lines into the view, then redraws it once.
+        Drains for at most `budget` seconds per tick and comes back sooner while
+        a backlog remains, so a flood is worked off without freezing the window.
+        """
+        deadline = time.perf_counter() + budget
+        append = self.log_box.append
+        get = self.log_queue.get_nowait
+        drained = 0
+        try:
+            while True:
+                append(*get())
+                drained += 1
+                # Checking the clock every line would cost more than the appends
+                if drained % 500 == 0 and time.perf_counter() > deadline:
                     break
-            self.log_box.see("end")
-            self.log_box.configure(state="disabled")
-        self.after(100, self.process_logs_loop)
+        except queue.Empty:
+            pass
+        self.log_box.dropped = self.text_handler.dropped
+        self.log_box.render()
+
+        if not self.log_queue.empty():
+            delay = 10
+        elif drained:
+            delay = 50
+        else:
+            delay = 100
+        self.after(delay, self.process_logs_loop)
 
     def check_status_loop(self):
         # Update dynamic labels
-        self.stats_label.configure(text=f"Monitored Directories: {len(self.monitor.watch_paths)}")
+        self.stats_label.configure(text=f"Monitored Directories: {len(self.monitor.watch_paths)}"
+                                        f"  |  Scan Queue: {self.monitor.executor.queue_depth()}")
         
         # Sync external USB state (e.g. if logic changed it)
         if self.monitor.usb_thread_running and self.usb_var.get() == "off":
@@ -0,0 +1,179 @@
+import os
+import time
+import hashlib
+import threading
+from collections import deque
+from .logger import logger
+
+# Optional C implementation of the automaton (pip install pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def _fold(text):
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters lowercase to two ('İ'); keep offsets aligned with the original text
+        lowered = "".join(c.lower()[0] for c in text)
+    return lowered
+
+def _is_word_char(c):
+    return c.isalnum() or c == '_'
+
+class _Automaton:
+    """Plain Python Aho-Corasick automaton, used when pyahocorasick isn't installed."""
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        # Lengths of the terms that end in each state
+        self.out = [()]
+
+        for term in terms:
+            state = 0
+            for c in term:
+                nxt = self.goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = nxt
+            self.out[state] += (len(term),)
+
+        # Breadth-first pass to fill in failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(c, 0)
+                self.out[nxt] += self.out[self.fail[nxt]]
+
+    def iter(self, text, pos=0):
+        """Yields (start, end) of every term occurrence, overlapping ones included."""
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i in range(pos, len(text)):
+            c = text[i]
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for length in out[state]:
+                yield i + 1 - length, i + 1
+
+class _CAutomaton:
+    """Same interface on top of pyahocorasick."""
+    def __init__(self, terms):
+        self.automaton = ahocorasick.Automaton()
+        for term in terms:
+            self.automaton.add_word(term, len(term))
+        self.automaton.make_automaton()
+
+    def iter(self, text, pos=0):
+        if len(self.automaton) == 0:
+            return
+        for end, length in self.automaton.iter(text, pos):
+            yield end + 1 - length, end + 1
+
+class KeywordDictionary:
+    """
+    Matches a (possibly huge) list of terms, e.g. project codenames or customer names,
+    in time linear in the text length whatever the list size.
+    Works as a detector scanner: calling it yields (start, end) spans.
+    Terms are read from a file (one per line, '#' for comments) and reloaded
+    when the file changes.
+    """
+    def __init__(self, path=None, terms=None, case_sensitive=False, whole_words=True,
+                 reload_interval=2.0):
+        self.path = path
+        self.case_sensitive = case_sensitive
+        self.whole_words = whole_words
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()
+        self.listeners = []
+
+        self.loaded_mtime = None
+        self.last_check = 0.0
+        self.terms = ()
+        self.automaton = None
+        self.version = ""
+
+        if terms is not None:
+            self.set_terms(terms)
+        elif path:
+            self.reload()
+
+    def set_terms(self, terms):
+        """Builds a new automaton and swaps it in; scans in progress keep the old one."""
+        fold = (lambda t: t) if self.case_sensitive else _fold
+        terms = sorted({fold(t.strip()) for t in terms if t.strip()})
+        automaton = (_CAutomaton if ahocorasick else _Automaton)(terms)
+
+        h = hashlib.blake2b(digest_size=8)
+        h.update(f"{self.case_sensitive}:{self.whole_words}".encode())
+        for t in terms:
+            h.update(t.encode('utf-8', 'surrogatepass') + b"\n")
+
+        with self.lock:
+            self.terms = tuple(terms)
+            self.automaton = automaton
+            self.version = h.hexdigest()
+
+        for callback in self.listeners:
+            callback()
+
+    def reload(self):
+        """Re-reads the term file."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, 'r', encoding='utf-8', errors='ignore') as f:
+                terms = [line for line in f.read().splitlines() if not line.lstrip().startswith('#')]
+        except OSError as e:
+            logger.error(f"Cannot load keyword list {self.path}: {e}")
+            if not self.version:
+                # Nothing loaded yet; still needs a version for the rule fingerprint
+                self.version = f"unloaded:{self.path}"
+            return
+        self.loaded_mtime = mtime
+        self.set_terms(terms)
+        logger.info(f"Loaded {len(self.terms)} keywords from {self.path}")
+
+    def check_reload(self):
+        """Reloads the file if it changed (checked at most every reload_interval seconds)."""
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now - self.last_check < self.reload_interval:
+            return
+        self.last_check = now
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self.loaded_mtime:
+            self.reload()
+
+    def __call__(self, text, pos=0):
+        """Yields (start, end) of the non-overlapping, leftmost-longest term matches."""
+        self.check_reload()
+        automaton = self.automaton
+        if automaton is None or not self.terms:
+            return
+
+        haystack = text if self.case_sensitive else _fold(text)
+        found = automaton.iter(haystack, pos)
+        if self.whole_words:
+            found = ((s, e) for s, e in found
+                     if not (s > 0 and _is_word_char(text[s - 1]))
+                     and not (e < len(text) and _is_word_char(text[e])))
+
+        last_end = pos
+        for start, end in sorted(found, key=lambda span: (span[0], -span[1])):
+            if start >= last_end:
+                yield start, end
+                last_end = end
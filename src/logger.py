@@ -1,97 +1,228 @@
 import logging
+import logging.handlers
 import os
 import sys
 import time
-import hashlib
+import queue
+import atexit
+import threading
+from collections import OrderedDict
 import colorama
 from colorama import Fore, Style
 
 # Initialize colorama
 colorama.init(autoreset=True)
 
+# What a record is about, set when it is logged (record.category) so outputs can
+# pick colors without searching the message text
+CATEGORY_FILE = "file"
+CATEGORY_USB = "usb"
+CATEGORY_CLIPBOARD = "clipboard"
+CATEGORY_STATUS = "status"
+
+class AlertHistory:
+    """
+    Last time each alert was logged, kept only for as long as it can suppress a repeat.
+    Entries are ordered by that time, so expired ones are always at the front and
+    are dropped as new alerts come in. `max_entries` caps memory on busy machines
+    (the oldest alerts go first). Not thread safe; the logger holds its lock.
+    """
+    def __init__(self, ttl, max_entries=100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+        self.hits = 0       # Repeats suppressed
+        self.misses = 0     # Alerts let through
+        self.expired = 0
+        self.evicted = 0    # Dropped early because of max_entries
+
+    def seen_recently(self, key, now):
+        """True if key was logged less than ttl ago; otherwise records it as logged now."""
+        self._expire(now)
+        last_time = self.entries.get(key)
+        if last_time is not None and now - last_time <= self.ttl:
+            self.hits += 1
+            return True
+
+        self.misses += 1
+        self.entries[key] = now
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+        return False
+
+    def _expire(self, now):
+        entries = self.entries
+        while entries:
+            key, last_time = next(iter(entries.items()))
+            if now - last_time <= self.ttl:
+                break
+            del entries[key]
+            self.expired += 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "expired": self.expired, "evicted": self.evicted}
+
+class _BatchFlushMixin:
+    """Handler that writes without flushing; the listener flushes once per batch."""
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+class BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchFileHandler(_BatchFlushMixin, logging.FileHandler):
+    pass
+
+class BatchQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that drains everything waiting in the queue before flushing
+    the handlers, so a burst of records costs one flush instead of one per record.
+    """
+    def __init__(self, queue, *handlers, max_batch=500):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.max_batch = max_batch
+
+    def add_handler(self, handler):
+        # The listener thread reads self.handlers per record; swapping the tuple is safe
+        self.handlers = self.handlers + (handler,)
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                pass
+
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                elif isinstance(record, threading.Event):
+                    # flush() marker: everything queued before it has been handled
+                    self._flush_handlers()
+                    record.set()
+                else:
+                    self.handle(record)
+            self._flush_handlers()
+            if stop:
+                return
+
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            try:
+                getattr(handler, "flush_batch", handler.flush)()
+            except Exception:
+                # e.g. console closed; don't kill the listener thread
+                pass
+
 class DeduplicationLogger:
-    def __init__(self, logger, cooldown_seconds=60):
+    def __init__(self, logger, cooldown_seconds=60, max_alerts=100_000, listener=None):
         self.logger = logger
+        # Writes records to the console/file/GUI on its own thread (see setup_logger)
+        self.listener = listener
         self.cooldown = cooldown_seconds
-        # Dictionary to store last logged time: {hash: timestamp}
-        self.alert_history = {}
+        # Recently logged alerts: {key: timestamp}, bounded in time and size
+        self.alert_history = AlertHistory(cooldown_seconds, max_alerts)
+        # Scan workers log concurrently; keep each batch together
+        self.lock = threading.Lock()
 
     def addHandler(self, hdlr):
-        """Delegates addHandler to the underlying logger."""
-        self.logger.addHandler(hdlr)
+        """Adds an output; it runs on the listener thread, not on the thread that logs."""
+        if self.listener is not None:
+            self.listener.add_handler(hdlr)
+        else:
+            self.logger.addHandler(hdlr)
+
+    def flush(self, timeout=2.0):
+        """Waits until everything logged so far has been written."""
+        if self.listener is None or self.listener._thread is None:
+            return
+        done = threading.Event()
+        self.listener.queue.put(done)
+        done.wait(timeout)
 
     def _generate_key(self, source, match_type, value):
         """Generates a unique key for the event."""
-        # We hash the value to avoid keeping sensitive plain text in memory if possible, 
-        # though the key itself is just for lookup.
-        raw_str = f"{source}:{match_type}:{value}"
-        return hashlib.md5(raw_str.encode()).hexdigest()
+        # Only the hash is kept, not the sensitive plain text. Python's tuple hash is
+        # plenty for a lookup key and much cheaper than md5 + hex.
+        return hash((source, match_type, value))
 
-    def log_batch(self, source, matches):
+    def log_batch(self, source, matches, path=None, category=None):
         """
         Logs a batch of matches for a single source, filtering out duplicates.
+        The matches also travel on the log record, for structured sinks (findings_store.py).
         """
         new_matches = []
-        now = time.time()
+        now = time.monotonic()
         
-        for m in matches:
-            # Create a unique key for EACH match
-            key = self._generate_key(source, m['type'], m['value'])
-            last_time = self.alert_history.get(key, 0)
+        with self.lock:
+            for m in matches:
+                # Create a unique key for EACH match
+                key = self._generate_key(source, m['type'], m['value'])
+                
+                # If ANY match in this batch is new, we want to log it
+                if not self.alert_history.seen_recently(key, now):
+                    new_matches.append(m)
             
-            # If ANY match in this batch is new, we want to log it
-            if now - last_time > self.cooldown:
-                new_matches.append(m)
-                self.alert_history[key] = now
-        
-        if new_matches:
-            self.logger.warning(f"SENSITIVE DATA DETECTED in {source}!")
-            for m in new_matches:
-                 self.logger.warning(f"  - [{m['type']}] {m['value']} (via {m.get('method', 'Unknown')})")
+            if new_matches:
+                self.logger.warning(f"SENSITIVE DATA DETECTED in {source}!",
+                                    extra={"findings": new_matches, "source": source, "path": path,
+                                           "category": category})
+                extra = {"category": category}
+                for m in new_matches:
+                     self.logger.warning(f"  - [{m['type']}] {m['value']} (via {m.get('method', 'Unknown')})",
+                                         extra=extra)
+
+    def dedup_stats(self):
+        with self.lock:
+            return self.alert_history.stats()
 
-    def info(self, msg):
-        self.logger.info(msg)
+    def info(self, msg, category=None):
+        self.logger.info(msg, extra={"category": category})
     
-    def warning(self, msg):
-        self.logger.warning(msg)
+    def warning(self, msg, category=None):
+        self.logger.warning(msg, extra={"category": category})
 
-    def error(self, msg):
-        self.logger.error(msg)
+    def error(self, msg, category=None):
+        self.logger.error(msg, extra={"category": category})
         
-    def exception(self, msg):
-        self.logger.exception(msg)
+    def exception(self, msg, category=None):
+        self.logger.exception(msg, extra={"category": category})
 
 class ColoredFormatter(logging.Formatter):
-    """Custom formatter to add colors to warning/error logs"""
+    """Custom formatter to add colors to warning/error logs (picked by level and record.category)"""
+    # Detections: yellow for clipboard, purple for USB, red otherwise
+    WARNING_COLORS = {CATEGORY_CLIPBOARD: Fore.YELLOW, CATEGORY_USB: Fore.MAGENTA}
+    # Info: green for scan progress, blue for monitors starting/drives showing up
+    INFO_COLORS = {CATEGORY_STATUS: Fore.GREEN, CATEGORY_FILE: Fore.BLUE,
+                   CATEGORY_USB: Fore.BLUE, CATEGORY_CLIPBOARD: Fore.BLUE}
+
     def format(self, record):
         # Format the message formally first
         log_msg = super().format(record)
-        
-        # Add colors based on level
-        # Custom Color Logic
-        msg_lower = record.msg.lower()
-        
-        # 1. INFO Levels
+        category = getattr(record, "category", None)
+
+        # 1. INFO Levels (plain unless it has a category)
         if record.levelno == logging.INFO:
-            if "initial scan completed" in msg_lower or "performing initial scan" in msg_lower: # Green
-                return Fore.GREEN + log_msg + Style.RESET_ALL
-            elif "monitor started on" in msg_lower or "monitoring directories" in msg_lower or "external drive scanner" in msg_lower or "new external drive" in msg_lower: # Blue
-                return Fore.BLUE + log_msg + Style.RESET_ALL
-            elif "scanning file" in msg_lower: # Keep generic scanning info neutral or maybe blue? User said "scanning external drive info... blue"
-                # If specific requirements for "scanning user folders info messages blue", the above covers "monitoring directories".
-                pass
+            color = self.INFO_COLORS.get(category)
+            return color + log_msg + Style.RESET_ALL if color else log_msg
 
         # 2. WARNING Levels (Detections)
         if record.levelno == logging.WARNING:
-            if "clipboard" in msg_lower: # Yellow
-                return Fore.YELLOW + log_msg + Style.RESET_ALL
-            elif "usb file" in msg_lower: # Purple
-                return Fore.MAGENTA + log_msg + Style.RESET_ALL
-            elif "file" in msg_lower: # Red (Local file default)
-                return Fore.RED + log_msg + Style.RESET_ALL
-            
-            # Default Warning Red
-            return Fore.RED + log_msg + Style.RESET_ALL
+            return self.WARNING_COLORS.get(category, Fore.RED) + log_msg + Style.RESET_ALL
             
         # 3. ERROR/CRITICAL
         if record.levelno >= logging.ERROR:
@@ -100,7 +231,11 @@ class ColoredFormatter(logging.Formatter):
         return log_msg
 
 def setup_logger(name="DLP_System", log_file="dlp_log.log", level=logging.INFO):
-    """Function to setup as many loggers as you want"""
+    """
+    Function to setup as many loggers as you want.
+    Logging calls only put the record on a queue; a listener thread formats it and
+    does the console/file I/O, so scan threads never wait on the terminal or disk.
+    """
     
     # Standard formatter for file (clean text)
     file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -108,23 +243,28 @@ def setup_logger(name="DLP_System", log_file="dlp_log.log", level=logging.INFO):
     # Colored formatter for console
     console_formatter = ColoredFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
-    # console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
-    
-    # file handler
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(file_formatter)
-    
     base_logger = logging.getLogger(name)
     base_logger.setLevel(level)
     
     # Avoid adding handlers multiple times
+    listener = None
     if not base_logger.handlers:
-        base_logger.addHandler(console_handler)
-        base_logger.addHandler(file_handler)
+        # console handler
+        console_handler = BatchStreamHandler(sys.stdout)
+        console_handler.setFormatter(console_formatter)
+        
+        # file handler
+        file_handler = BatchFileHandler(log_file)
+        file_handler.setFormatter(file_formatter)
+
+        log_queue = queue.SimpleQueue()
+        base_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = BatchQueueListener(log_queue, console_handler, file_handler)
+        listener.start()
+        # Write out whatever is still queued when the program exits
+        atexit.register(listener.stop)
         
-    return DeduplicationLogger(base_logger, cooldown_seconds=10)
+    return DeduplicationLogger(base_logger, cooldown_seconds=10, listener=listener)
 
 # Create a default logger instance
 logger = setup_logger()
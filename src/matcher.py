@@ -0,0 +1,247 @@
+import re
+import threading
+
+# Optional multi-pattern engines. Either one finds in a single pass which rules can match at all.
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Python's Unicode classes in RE2 syntax (RE2's own \w, \d and \s are ASCII only).
+# Used inside a character class.
+_RE2_CLASSES = {
+    'w': r'\p{L}\p{N}_',
+    'd': r'\p{Nd}',
+    's': r'\s\x0b\p{Z}\x1c-\x1f\x85',
+}
+
+def re2_prefilter_pattern(pattern):
+    """
+    Rewrites a Python regex for re2.Set so it matches wherever the Python one does
+    (and possibly more): \\w, \\d and \\s get Python's Unicode meaning, and \\b/\\B,
+    which RE2 only knows in ASCII, are dropped. Returns None if that can't be done safely.
+    """
+    if pattern.flags & re.ASCII:
+        # Same ASCII semantics in both engines
+        return pattern.pattern
+    source = pattern.pattern
+    out = []
+    in_class = False
+    i = 0
+    while i < len(source):
+        c = source[i]
+        if c == '\\' and i + 1 < len(source):
+            e = source[i + 1]
+            i += 2
+            if e in 'bB':
+                if in_class:
+                    # [\b] is a backspace in Python
+                    return None
+                continue
+            if e.lower() in _RE2_CLASSES:
+                chars = _RE2_CLASSES[e.lower()]
+                if not in_class:
+                    out.append(f"[{chars}]" if e.islower() else f"[^{chars}]")
+                elif e.islower():
+                    out.append(chars)
+                else:
+                    # A negated class inside a class has no RE2 spelling
+                    return None
+                continue
+            out.append(c + e)
+            continue
+        if c == '[' and not in_class:
+            in_class = True
+            out.append(c)
+            # A ']' right after '[' or '[^' is a literal
+            for lead in ('^', ']'):
+                if source.startswith(lead, i + 1):
+                    out.append(lead)
+                    i += 1
+        elif c == ']' and in_class:
+            in_class = False
+            out.append(c)
+        else:
+            out.append(c)
+        i += 1
+    return ''.join(out)
+
+class RuleMatcher:
+    """
+    Prefilter for a set of regex rules: finds which rules can match a text, so
+    rules without a hit don't run at all. The matches themselves always come from
+    each rule's own Python regex, so results are exactly those of the per-pattern loop.
+    With hyperscan or google-re2 installed, the prefilter is a single pass over the text
+    for all rules; without either, every rule runs (the per-pattern loop itself).
+    """
+    def __init__(self, patterns, backend=None):
+        self.patterns = dict(patterns)
+        self.labels = list(self.patterns)
+        # Rules the engine couldn't compile; they always run
+        self.always = set()
+        self.local = threading.local()
+
+        if backend is None:
+            backend = "hyperscan" if hyperscan else "re2" if re2 else "re"
+        self.backend = backend
+
+        if backend == "hyperscan":
+            self._build_hyperscan()
+        elif backend == "re2":
+            self._build_re2()
+        elif backend != "re":
+            raise ValueError(f"Unknown regex backend: {backend}")
+
+    def rules_for(self, text):
+        """Returns (label, pattern) for every rule that may match somewhere in text (never fewer)."""
+        if self.backend == "re" or not text:
+            return list(self.patterns.items())
+
+        try:
+            hits = self._hits(text)
+        except UnicodeEncodeError:
+            # Lone surrogates (undecodable bytes) can't go to the engine
+            return list(self.patterns.items())
+
+        hits |= self.always
+        return [(label, self.patterns[label]) for i, label in enumerate(self.labels) if i in hits]
+
+    def finditer(self, text, pos=0):
+        """Yields (label, match) for every rule, rule by rule (one finditer per rule that passed the prefilter)."""
+        for label, pattern in self.rules_for(text):
+            for match in pattern.finditer(text, pos):
+                yield label, match
+
+    def _hits(self, text):
+        if self.backend == "hyperscan":
+            hits = set()
+
+            def on_match(rule_id, start, end, flags, context):
+                hits.add(rule_id)
+
+            self.db.scan(text.encode('utf-8'), match_event_handler=on_match, scratch=self._scratch())
+            return hits
+
+        text.encode('utf-8')  # Same surrogate check as hyperscan
+        # None when no rule matches
+        return {self.set_ids[i] for i in self.set.Match(text) or ()}
+
+    # --- hyperscan ---
+    def _hyperscan_flags(self, pattern):
+        # PREFILTER accepts constructs hyperscan can't do exactly (backrefs, lookarounds):
+        # it may report extra hits, never fewer. The Python regex has the final say.
+        flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8
+        if not pattern.flags & re.ASCII:
+            flags |= hyperscan.HS_FLAG_UCP
+        if pattern.flags & re.IGNORECASE:
+            flags |= hyperscan.HS_FLAG_CASELESS
+        if pattern.flags & re.MULTILINE:
+            flags |= hyperscan.HS_FLAG_MULTILINE
+        if pattern.flags & re.DOTALL:
+            flags |= hyperscan.HS_FLAG_DOTALL
+        return flags
+
+    def _build_hyperscan(self):
+        rules = []
+        for i, label in enumerate(self.labels):
+            pattern = self.patterns[label]
+            if pattern.flags & re.VERBOSE or not self._hyperscan_compiles(pattern):
+                self.always.add(i)
+            else:
+                rules.append((i, pattern))
+
+        if not rules:
+            self.backend = "re"
+            return
+
+        self.db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        self.db.compile(expressions=[p.pattern.encode('utf-8') for _, p in rules],
+                        ids=[i for i, _ in rules],
+                        elements=len(rules),
+                        flags=[self._hyperscan_flags(p) for _, p in rules])
+
+    def _hyperscan_compiles(self, pattern):
+        try:
+            db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+            db.compile(expressions=[pattern.pattern.encode('utf-8')], ids=[0], elements=1,
+                       flags=[self._hyperscan_flags(pattern)])
+            return True
+        except hyperscan.error:
+            return False
+
+    def _scratch(self):
+        # Scratch space can't be shared between threads
+        scratch = getattr(self.local, "scratch", None)
+        if scratch is None:
+            scratch = self.local.scratch = hyperscan.Scratch(self.db)
+        return scratch
+
+    # --- re2 ---
+    def _build_re2(self):
+        self.set = re2.Set.SearchSet(re2.Options())
+        # re2.Set index -> rule index
+        self.set_ids = []
+        for i, label in enumerate(self.labels):
+            pattern = self.patterns[label]
+            if pattern.flags & re.VERBOSE:
+                self.always.add(i)
+                continue
+            source = re2_prefilter_pattern(pattern)
+            if source is None:
+                self.always.add(i)
+                continue
+            flags = ''.join(f for f, bit in (('i', re.IGNORECASE), ('m', re.MULTILINE), ('s', re.DOTALL))
+                            if pattern.flags & bit)
+            try:
+                self.set.Add(f"(?{flags}){source}" if flags else source)
+                self.set_ids.append(i)
+            except Exception:
+                # e.g. backreferences or lookarounds
+                self.always.add(i)
+
+        if not self.set_ids:
+            self.backend = "re"
+            return
+        self.set.Compile()
+
+def per_pattern_scan(patterns, text):
+    """The original scan_text loop: one finditer per rule."""
+    return [(label, m.start(), m.group()) for label, pattern in patterns.items()
+            for m in pattern.finditer(text)]
+
+def benchmark(extra_rules=100, words=200_000, repeat=3):
+    """Compares the per-pattern loop with every available backend on synthetic text."""
+    import random
+    import timeit
+    from .detector import DEFAULT_PATTERNS
+
+    random.seed(0)
+    vocab = ("the quick brown fox jumps over the lazy dog lorem ipsum dolor sit amet "
+             "secret 4111 1111 1111 1111 john.doe@corp.com 123-45-6789").split()
+    text = " ".join(random.choice(vocab) for _ in range(words))
+
+    rule_sets = {"default rules": dict(DEFAULT_PATTERNS)}
+    many = dict(DEFAULT_PATTERNS)
+    for i in range(extra_rules):
+        many[f"PROJECT_{i}"] = re.compile(rf'\bPRJ-{i:03d}-[A-Z]{{3}}\b')
+    rule_sets[f"default + {extra_rules} rules"] = many
+
+    backends = ["re"] + (["re2"] if re2 else []) + (["hyperscan"] if hyperscan else [])
+    for name, patterns in rule_sets.items():
+        expected = sorted(per_pattern_scan(patterns, text))
+        baseline = timeit.timeit(lambda: per_pattern_scan(patterns, text), number=repeat) / repeat
+        print(f"{name} ({len(text) // 1024} KB): per-pattern loop {baseline * 1000:.1f} ms")
+        for backend in backends:
+            matcher = RuleMatcher(patterns, backend=backend)
+            scan = lambda: [(label, m.start(), m.group()) for label, m in matcher.finditer(text)]
+            same = sorted(scan()) == expected
+            took = timeit.timeit(scan, number=repeat) / repeat
+            print(f"  {backend:10s} {took * 1000:8.1f} ms  ({baseline / took:.1f}x, same results: {same})")
+
+if __name__ == "__main__":
+    benchmark()
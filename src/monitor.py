@@ -1,88 +1,411 @@
 import time
 import os
 import threading
-import pyperclip
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from .logger import logger
+from .logger import logger, CATEGORY_FILE, CATEGORY_USB, CATEGORY_CLIPBOARD, CATEGORY_STATUS
 from .detector import PII_Detector
-from .usb_detector import get_removable_drives
+from .usb_detector import removable_drives, create_mount_watcher
+from .scheduler import DebouncedScheduler
+from .executor import ScanExecutor, NERProcessPool, TextExtractorPool
+from .scan_index import ScanIndex, DEFAULT_INDEX_PATH
+from .findings_store import FindingsStore, FindingsHandler, DEFAULT_DB_PATH
+from .result_cache import ResultCache, content_hash, new_hasher
+from .clipboard import create_clipboard_backend
+from .crawler import Crawler
+from .path_filter import PathFilter
+from .archive_scanner import ArchiveScanner, ArchiveLimitExceeded, is_archive, TEXT_EXTENSIONS
+from .extractors import is_document
+from .sniffer import SNIFF_BYTES, StringsReader, sniff, code_unit, after_last_newline, printable_strings
+
+# Files bigger than this are scanned in chunks instead of being read whole
+STREAM_THRESHOLD = 1024 * 1024
+MAX_STORED_FINDINGS = 1000
+
+# Files that only ever grow at the end; after the first scan only appended bytes are read
+TAIL_EXTENSIONS = ('.log',)
+
+def last_line_end(f, start, end, window=64 * 1024, encoding='utf-8'):
+    """
+    Byte position just past the last newline in [start, end). Without one, `start`
+    (the unfinished line is scanned again) unless the line is longer than `window`.
+    """
+    pos = max(start, end - window)
+    # UTF-16/32 lines start on a code unit boundary
+    pos -= pos % code_unit(encoding)
+    f.seek(pos)
+    nl = after_last_newline(f.read(end - pos), encoding)
+    if nl != -1:
+        return pos + nl
+    # A huge line with no end in sight isn't rescanned forever
+    return start if pos <= start else end
 
 class FileEventHandler(FileSystemEventHandler):
-    def __init__(self, detector):
+    def __init__(self, detector, scheduler=None, index=None, cache=None, drives=None, path_filter=None,
+                 documents=None, binary_mode='skip'):
         self.detector = detector
+        # Which files are scanned (see path_filter.py); shared with the initial crawl
+        self.path_filter = path_filter or PathFilter()
+        # Binary content behind a text extension: 'skip' it or scan its printable 'strings'
+        self.binary_mode = binary_mode
+        # Looks inside zip/tar/gz files and Office documents, with per-member caching
+        self.archives = ArchiveScanner(detector, cache=cache,
+                                       text_extensions=self.path_filter.extensions or TEXT_EXTENSIONS,
+                                       binary_mode=binary_mode)
+        # Optional TextExtractorPool for Office/PDF files (without it, Office files are read as archives)
+        self.documents = documents
+        # Events are handed to the debouncer so the observer thread never waits on a scan
+        self.scheduler = scheduler
+        # Optional ScanIndex, skips files whose content was already scanned
+        self.index = index
+        # Optional ResultCache, reuses the findings of identical content at any path
+        self.cache = cache
+        # Cached removable-drive table used to label findings as USB
+        self.drives = drives or removable_drives
+        # Files scanned while the NLP model was still loading: path -> (stat, start offset)
+        self.deferred = {}
+        self.deferred_lock = threading.Lock()
 
     def on_created(self, event):
         if not event.is_directory:
-            self.process_file(event.src_path)
+            self.dispatch_file(event.src_path)
 
     def on_modified(self, event):
         if not event.is_directory:
-            self.process_file(event.src_path)
+            self.dispatch_file(event.src_path)
+
+    def dispatch_file(self, file_path):
+        """Queues a file for scanning once writes to it have settled."""
+        if not self.should_scan(file_path):
+            return
+        if self.scheduler is None:
+            self.process_file(file_path)
+        else:
+            self.scheduler.submit(file_path)
 
     def process_file(self, file_path):
         """Reads file content and scans for PII"""
+        self.process_files([file_path])
+
+    def process_files(self, file_paths):
+        """
+        Scans a batch of files. Small files are read whole and their NER runs
+        in one nlp.pipe call; big files and growing logs are streamed one by one.
+        """
+        pending = []
+        for file_path in file_paths:
+            try:
+                job = self.read_file(file_path)
+                if job:
+                    pending.append(job)
+            except Exception as e:
+                logger.error(f"Error reading file {file_path}: {e}")
+
+        if not pending:
+            return
+
+        # Same content already scanned elsewhere (copies, duplicate downloads)
+        results = [self.cache.get(job[3]) if self.cache else None for job in pending]
+        to_scan = [i for i, found in enumerate(results) if found is None]
+
+        # Identical files within the batch are scanned once
+        first_of = {}
+        for i in to_scan:
+            first_of.setdefault(pending[i][3], i)
+        unique = list(first_of.values())
+
+        # Taken before scanning: if NER can't run yet, these files get a NER-only pass later
+        ner_ready = self.detector.ner_ready
+        # Nothing more will be added to these results (model loaded, or unavailable for good)
+        final = not self.detector.ner_loading
+        if len(unique) == 1:
+            scanned = [self.detector.scan_text(pending[unique[0]][4])]
+        elif unique:
+            scanned = self.detector.scan_many([pending[i][4] for i in unique])
+        else:
+            scanned = []
+        for i, matches in zip(unique, scanned):
+            results[i] = matches
+            if self.cache and final:
+                self.cache.put(pending[i][3], matches)
+        for i in to_scan:
+            if results[i] is None:
+                results[i] = [dict(m) for m in results[first_of[pending[i][3]]]]
+        # Cached results are always complete
+        complete = [True] * len(pending)
+        for i in to_scan:
+            complete[i] = ner_ready
+
+        for (file_path, st, raw, digest, _, encoding), matches, done in zip(pending, results, complete):
+            try:
+                if self.index:
+                    self.index.record(file_path, st, digest, matches, complete=done)
+                    if file_path.endswith(TAIL_EXTENSIONS):
+                        # Same rule as last_line_end: a half-written last line is scanned again
+                        end = after_last_newline(raw, encoding)
+                        self.index.set_tail(file_path, st, end if end != -1 else 0)
+
+                if matches:
+                     source, category = self.source_of(file_path)
+                     logger.log_batch(source=source, matches=matches, path=file_path, category=category)
+                if not done:
+                    self.defer(file_path, st)
+            except Exception as e:
+                logger.error(f"Error reading file {file_path}: {e}")
+
+    def read_file(self, file_path):
+        """
+        Loads a small file for scanning: (path, stat, raw bytes, content hash, text, encoding).
+        Returns None if the file was skipped or already handled (streamed).
+        """
+        # Simple text file check for now
+        if not self.should_scan(file_path):
+            return None
+        
+        st = os.stat(file_path)
+        if self.path_filter.check_size(st.st_size):
+            return None
+        if self.index and self.is_indexed(file_path, st):
+            return None
+
+        if self.documents is not None and is_document(file_path):
+            return self.read_document(file_path, st)
+
+        if is_archive(file_path):
+            self.process_archive(file_path, st)
+            return None
+
+        if self.index is not None and file_path.endswith(TAIL_EXTENSIONS):
+            offset = self.index.tail_offset(file_path, st)
+            if offset:
+                # Only the bytes appended since the last scan
+                self.process_large_file(file_path, st, start=offset)
+                return None
+
+        if st.st_size > STREAM_THRESHOLD:
+            self.process_large_file(file_path, st)
+            return None
+
+        with open(file_path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+            encoding = sniff(head, complete=len(head) < SNIFF_BYTES)
+            if encoding is None and self.binary_mode != 'strings':
+                # A core dump named .log: the rest isn't even read
+                self.skip_binary(file_path, st)
+                return None
+            raw = head + f.read()
+
+        raw_hash = content_hash(raw)
+        # Touched or re-saved without changes
+        if self.index and self.index.has_content(file_path, st, raw_hash):
+            return None
+
+        logger.info(f"Scanning file: {file_path}")
+        if encoding is None:
+            return file_path, st, raw, raw_hash, printable_strings(raw).decode('ascii'), 'utf-8'
+        text = raw.decode(encoding, errors='replace').lstrip('\ufeff')
+        return file_path, st, raw, raw_hash, text, encoding
+
+    def is_indexed(self, file_path, st):
+        """True if the index already has the findings for this unchanged file."""
+        if self.index.is_unchanged(file_path, st):
+            return True
+        if self.detector.ner_loading and self.index.is_unchanged(file_path, st, regex_only=True):
+            # Scanned without NER last time: the Regex findings stand, NER follows if the model loads
+            self.defer(file_path, st)
+            return True
+        return False
+
+    def skip_binary(self, file_path, st):
+        """Indexed with no findings, so the file isn't opened and sniffed again until it changes."""
+        logger.info(f"Skipping binary file: {file_path}")
+        if self.index:
+            self.index.record(file_path, st, None, [])
+
+    def read_document(self, file_path, st):
+        """Like read_file, for a document whose text is extracted in a worker process."""
+        text = self.documents.extract(file_path)
+        if text is None:
+            return None
+        raw = text.encode('utf-8', 'surrogatepass')
+        text_hash = content_hash(raw)
+        # Re-saved with the same text
+        if self.index and self.index.has_content(file_path, st, text_hash):
+            return None
+        logger.info(f"Scanning document: {file_path}")
+        return file_path, st, raw, text_hash, text, 'utf-8'
+
+    def defer(self, file_path, st, start=0):
+        """Remembers a file whose NER step was skipped because the model wasn't loaded yet."""
+        with self.deferred_lock:
+            if self.detector.ner_unavailable:
+                # The NER step will never come
+                return
+            if not self.detector.ner_ready:
+                previous = self.deferred.get(file_path)
+                if previous is not None:
+                    # A growing log: keep the earliest unscanned offset
+                    start = min(start, previous[1])
+                self.deferred[file_path] = (st, start)
+                return
+        # The model finished loading while this file was being scanned
+        self.process_deferred(file_path, st, start)
+
+    def take_deferred(self):
+        with self.deferred_lock:
+            deferred, self.deferred = self.deferred, {}
+        return deferred
+
+    def process_deferred(self, file_path, st, start=0):
+        """Runs the missing NER step on a file scanned before the model was ready."""
         try:
-            # Simple text file check for now
-            if not self.should_scan(file_path):
+            current = os.stat(file_path)
+        except OSError:
+            return
+        same = (current.st_size, current.st_mtime_ns, current.st_ino) == (st.st_size, st.st_mtime_ns, st.st_ino)
+        # Logs only grow, so the part scanned earlier is still there even if more was appended
+        grown_log = (file_path.endswith(TAIL_EXTENSIONS) and current.st_ino == st.st_ino
+                     and current.st_size >= st.st_size)
+        if same and self.documents is not None and is_document(file_path):
+            self.process_document_ner(file_path, st)
+        elif same and is_archive(file_path):
+            self.process_archive(file_path, st, ner_only=True)
+        elif same or grown_log:
+            self.process_large_file(file_path, st, start=start, ner_only=True)
+        if not same:
+            # Changed since: scan the new content normally
+            self.process_file(file_path)
+
+    def process_large_file(self, file_path, st, start=0, batch_size=100, ner_only=False):
+        """
+        Streams a big file through the detector, logging findings as they come in.
+        With `start` set, only the bytes appended after that offset are scanned.
+        With ner_only, only NER runs and its findings are added to the ones already indexed.
+        """
+        with open(file_path, 'rb') as f:
+            # The encoding is sniffed at the start of the file, even when only appended bytes are read
+            head = f.read(SNIFF_BYTES)
+            encoding = sniff(head, complete=len(head) < SNIFF_BYTES)
+            if encoding is None and self.binary_mode != 'strings':
+                self.skip_binary(file_path, st)
                 return
-            
-            logger.info(f"Scanning file: {file_path}")
-
-            # Brief sleep to ensure file write is complete (prevents empty reads on some editors)
-            time.sleep(0.5)
-
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                
-            matches = self.detector.scan_text(content)
-            if matches:
-                 # Check if file is on a removable drive
-                 is_usb = False
-                 try:
-                     removable_drives = get_removable_drives()
-                     for drive in removable_drives:
-                         if file_path.lower().startswith(drive.lower()):
-                             is_usb = True
-                             break
-                 except:
-                     pass
-
-                 source_label = f"USB file {file_path}" if is_usb else f"file {file_path}"
-                 logger.log_batch(source=source_label, matches=matches)
-        except Exception as e:
-            logger.error(f"Error reading file {file_path}: {e}")
+
+            if ner_only:
+                logger.info(f"Scanning file (NLP, model now loaded): {file_path}")
+            elif start:
+                # Touched without growing: nothing is scanned, only the index entry is refreshed
+                if st.st_size > start:
+                    logger.info(f"Scanning file (appended {st.st_size - start} bytes): {file_path}")
+            else:
+                logger.info(f"Scanning file (streaming): {file_path}")
+            ner_ready = self.detector.ner_ready
+            # A partial scan can't produce the content hash
+            hasher = new_hasher() if not start else None
+            source, category = self.source_of(file_path)
+            findings = []
+            batch = []
+
+            f.seek(start)
+            # Binary content: only its printable strings, at their original offsets
+            stream = f if encoding else StringsReader(f)
+            encoding = encoding or 'utf-8'
+            for match in self.detector.scan_stream(stream, hasher=hasher, start=start, limit=st.st_size - start,
+                                                   regex=not ner_only, encoding=encoding):
+                batch.append(match)
+                if len(batch) >= batch_size:
+                    logger.log_batch(source=source, matches=batch, path=file_path, category=category)
+                    # Only a bounded sample is kept for the index
+                    if len(findings) < MAX_STORED_FINDINGS:
+                        findings.extend(batch)
+                    batch = []
+            # Resume from the last complete line so a half-written line is scanned whole next time
+            line_end = last_line_end(f, start, st.st_size, encoding=encoding)
+        if batch:
+            logger.log_batch(source=source, matches=batch, path=file_path, category=category)
+            findings.extend(batch)
+
+        if self.index:
+            if start or ner_only:
+                findings = (self.index.findings(file_path) + findings)[-MAX_STORED_FINDINGS:]
+            self.index.record(file_path, st, hasher.hexdigest() if hasher else None, findings,
+                              complete=ner_ready)
+            if file_path.endswith(TAIL_EXTENSIONS):
+                self.index.set_tail(file_path, st, line_end)
+        if not ner_ready:
+            self.defer(file_path, st, start)
+
+    def process_document_ner(self, file_path, st):
+        """NER-only pass over a document's text; its Regex findings were logged already."""
+        # Comes from the extraction cache, the document isn't parsed again
+        text = self.documents.extract(file_path)
+        if text is None:
+            return
+        logger.info(f"Scanning document (NLP, model now loaded): {file_path}")
+        matches = self.detector.scan_ner(text)
+        if matches:
+            source, category = self.source_of(file_path)
+            logger.log_batch(source=source, matches=matches, path=file_path, category=category)
+        if self.index:
+            findings = (self.index.findings(file_path) + matches)[-MAX_STORED_FINDINGS:]
+            self.index.record(file_path, st, content_hash(text), findings)
+
+    def process_archive(self, file_path, st, ner_only=False):
+        """
+        Scans the text members of an archive as streams, nothing is extracted to disk.
+        Members unchanged since the last scan come from the cache and aren't reported again.
+        """
+        if ner_only:
+            logger.info(f"Scanning archive (NLP, model now loaded): {file_path}")
+        else:
+            logger.info(f"Scanning archive: {file_path}")
+        ner_ready = self.detector.ner_ready
+        source, category = self.source_of(file_path)
+        findings = []
+
+        try:
+            for member, matches, cached in self.archives.scan(file_path, regex=not ner_only):
+                if len(findings) < MAX_STORED_FINDINGS:
+                    findings.extend(matches)
+                if matches and not cached:
+                    logger.log_batch(source=f"{source} ({member})", matches=matches, path=file_path,
+                                     category=category)
+        except ArchiveLimitExceeded as e:
+            # Likely a zip bomb; what was scanned before the limit still counts
+            logger.warning(f"Archive scan stopped early, {file_path}: {e}", category=category)
+
+        if self.index:
+            if ner_only:
+                findings = self.index.findings(file_path) + findings
+            self.index.record(file_path, st, None, findings[-MAX_STORED_FINDINGS:], complete=ner_ready)
+        if not ner_ready:
+            self.defer(file_path, st)
+
+    def source_of(self, file_path):
+        """Log label and category for findings in a file."""
+        # Check if file is on a removable drive
+        if self.drives.is_removable(file_path):
+            return f"USB file {file_path}", CATEGORY_USB
+        return f"file {file_path}", CATEGORY_FILE
 
     def should_scan(self, file_path):
-        """Decides if a file should be scanned."""
-        filename = os.path.basename(file_path)
-        
-        # 1. Ignore specific system/project files
-        ignored_files = {
-            'dlp_log.log', 'requirements.txt', 'task.md', 'implementation_plan.md', 
-            'walkthrough.md', 'verify_setup.py', 'monitor.py', 'detector.py', 
-            'logger.py', 'main.py'
-        }
-        if filename in ignored_files:
-            return False
-
-        # 2. Ignore specific directories
-        # Check if any part of the path is in ignored list
-        parts = file_path.split(os.sep)
-        ignored_dirs = {'.git', '.vscode', '__pycache__', '.venv', 'env', 'src', '.gemini', 'docs'}
-        if any(p in ignored_dirs for p in parts):
-            return False
-
-        # 3. Inclusion Rules (Only scan specific text formats)
-        valid_extensions = ('.txt', '.csv', '.log', '.md', '.json', '.xml')
-        if not file_path.endswith(valid_extensions):
-            return False
-            
-        return True
+        """Decides if a file should be scanned (path_filter.check() tells why not)."""
+        return self.path_filter.check(file_path) is None
 
 class SystemMonitor:
-    def __init__(self, watch_paths=None):
-        self.detector = PII_Detector()
+    def __init__(self, watch_paths=None, scan_workers=4, ner_processes=0, queue_size=1000,
+                 index_path=DEFAULT_INDEX_PATH, ner_prefilter=True, keyword_file=None,
+                 findings_path=DEFAULT_DB_PATH, cache_path=None, filter_config=None,
+                 extract_processes=2, extract_timeout=30.0, binary_mode='skip'):
+        # The NLP model loads in the background; Regex scanning starts right away
+        self.detector = PII_Detector(lazy=True)
+        self.detector.ner_gate.enabled = ner_prefilter
+        if keyword_file:
+            # Reloaded automatically when the file changes
+            self.detector.add_keyword_list(keyword_file)
+        # Optional: move spacy NER into worker processes (regex stays on the scan threads).
+        # The pool is started once the model is loaded (see _on_model_ready).
+        self.ner_processes = ner_processes
+        self.ner_pool = None
         # Ensure watch_paths is a list. Default to current directory if None.
         if watch_paths is None:
             watch_paths = ["."]
@@ -91,29 +414,209 @@ class SystemMonitor:
             
         self.watch_paths = watch_paths
         self.observer = Observer()
+        # path -> ObservedWatch, so one path can be unscheduled without restarting the observer
+        self.watches = {}
+        self.watch_lock = threading.Lock()
         self.running = False
         self.usb_thread = None
         self.usb_thread_running = False
         self.known_drives = set()
+        self.drives = removable_drives
+        # Created on first use (see clipboard.py); can be set to a FakeClipboard in tests
+        self.clipboard_backend = None
+
+        # Scans run on a bounded worker pool, never on the watchdog thread
+        self.executor = ScanExecutor(workers=scan_workers, queue_size=queue_size)
+        # Paths queued or being scanned, so one file is never scanned by two workers at once
+        # (they'd read the same tail offset and report the appended bytes twice)
+        self.in_flight = set()
+        # In-flight paths that settled again meanwhile: rescanned once their scan is done
+        self.rescan = set()
+        # NER passes for in-flight paths: path -> (stat, start offset), run when their scan is done
+        self.ner_after = {}
+        self.flight_lock = threading.Lock()
+
+        # Remembers unchanged files across restarts (None disables it)
+        self.index = None
+        if index_path:
+            self.index = ScanIndex(index_path, self.detector.version(),
+                                   regex_version=self.detector.version(ner=False))
+        # Findings by content hash, shared by file and clipboard scanning
+        # (kept on disk too if cache_path is set)
+        self.result_cache = ResultCache(self.detector.version(), path=cache_path)
+
+        # Queryable copy of every logged detection (None disables it)
+        self.findings = None
+        if findings_path:
+            self.findings = FindingsStore(findings_path)
+            logger.addHandler(FindingsHandler(self.findings))
+
+        # Exclude globs, extensions and size limits, from a JSON file if given
+        self.path_filter = PathFilter.from_file(filter_config) if filter_config else PathFilter()
+
+        # Office/PDF text is extracted in worker processes, with a per-file timeout (0 disables it)
+        self.documents = None
+        if extract_processes > 0:
+            self.documents = TextExtractorPool(processes=extract_processes, timeout=extract_timeout)
+
+        # Collapses repeated create/modify events for a path into one scan job
+        self.event_handler = FileEventHandler(self.detector, index=self.index, cache=self.result_cache,
+                                              drives=self.drives, path_filter=self.path_filter,
+                                              documents=self.documents, binary_mode=binary_mode)
+        self.scheduler = DebouncedScheduler(callback=self.queue_scan, folder_callback=self.rescan_folder)
+        self.event_handler.scheduler = self.scheduler
+        self.detector.on_ready(self._on_model_ready)
+        self.detector.rules_listeners.append(self._on_rules_changed)
+        # The model may have failed to load before the listener was added
+        self._on_rules_changed()
+
+    def _on_model_ready(self):
+        if self.ner_processes > 0:
+            # Started once the model is on disk (downloaded if needed); each worker loads its own copy
+            self.ner_pool = NERProcessPool(self.detector.model_name, processes=self.ner_processes)
+            self.detector.ner_pool = self.ner_pool
+
+        deferred = self.event_handler.take_deferred()
+        if deferred:
+            logger.info(f"NLP model ready, running NLP scan on {len(deferred)} files scanned before.")
+        for file_path, (st, start) in deferred.items():
+            with self.flight_lock:
+                busy = file_path in self.in_flight
+                if busy:
+                    # Being scanned right now: the NER pass follows that scan
+                    self.ner_after[file_path] = (st, start)
+                else:
+                    self.in_flight.add(file_path)
+            if not busy:
+                self.executor.submit(self._deferred_claimed, file_path, st, start)
+
+    def _on_rules_changed(self):
+        # Old results no longer say what the new rules would find
+        version = self.detector.version()
+        if self.index:
+            self.index.set_version(version, self.detector.version(ner=False))
+        self.result_cache.set_version(version)
+        if self.detector.ner_unavailable:
+            # No NER pass will come for the files that were waiting for one
+            dropped = self.event_handler.take_deferred()
+            if dropped:
+                logger.info(f"NLP model unavailable, {len(dropped)} files keep their Regex findings only.")
+
+    def queue_scan(self, file_path):
+        """Hands a file to the scan workers (blocks while the queue is full)."""
+        self.queue_scan_batch([file_path])
+
+    def queue_scan_batch(self, file_paths):
+        """Hands several files to one worker so their NER runs as a single batch."""
+        claimed = self._claim(file_paths)
+        if claimed:
+            self.executor.submit(self._scan_claimed, claimed)
+
+    def _claim(self, file_paths):
+        """Marks the paths as in flight and returns them; busy ones are rescanned after their scan."""
+        claimed = []
+        with self.flight_lock:
+            for file_path in file_paths:
+                if file_path in self.in_flight:
+                    self.rescan.add(file_path)
+                else:
+                    self.in_flight.add(file_path)
+                    claimed.append(file_path)
+        return claimed
+
+    def _release(self, file_paths):
+        while True:
+            with self.flight_lock:
+                waiting = [(p, self.ner_after.pop(p)) for p in file_paths if p in self.ner_after]
+                if not waiting:
+                    again = [p for p in file_paths if p in self.rescan]
+                    self.in_flight.difference_update(file_paths)
+                    self.rescan.difference_update(again)
+                    break
+            # NER passes that came in during the scan; the paths are still in flight
+            for file_path, (st, start) in waiting:
+                if self.index and self.index.is_unchanged(file_path):
+                    # The scan that just ended already ran NER
+                    continue
+                try:
+                    self.event_handler.process_deferred(file_path, st, start)
+                except Exception as e:
+                    logger.error(f"Error reading file {file_path}: {e}")
+
+        # Through the debouncer: a worker must not block on the full scan queue
+        for file_path in again:
+            self.scheduler.submit(file_path)
 
-    def scan_existing_files(self, specific_path=None):
+    def _scan_claimed(self, file_paths):
+        try:
+            self.event_handler.process_files(file_paths)
+        finally:
+            self._release(file_paths)
+
+    def _deferred_claimed(self, file_path, st, start):
+        try:
+            self.event_handler.process_deferred(file_path, st, start)
+        finally:
+            self._release([file_path])
+
+    def rescan_folder(self, folder, batch_size=32):
+        """Scans the files directly in a folder (its events overflowed the scheduler)."""
+        try:
+            with os.scandir(folder) as entries:
+                files = [e.path for e in entries
+                         if e.is_file() and self.path_filter.check(e.path) is None]
+        except OSError:
+            return
+        for i in range(0, len(files), batch_size):
+            self.queue_scan_batch(files[i:i + batch_size])
+
+    def scan_existing_files(self, specific_path=None, batch_size=32, crawl_workers=8):
         """Scans all existing files in the watch paths (or a specific one) on startup."""
         paths_to_scan = [specific_path] if specific_path else self.watch_paths
+        unchanged = 0
+        batch = []
         
+        roots = []
         for path in paths_to_scan:
-            logger.info(f"Performing initial scan of: {os.path.abspath(path)}")
-            event_handler = FileEventHandler(self.detector)
-            # Walk through each watched path
-            if os.path.exists(path):
-                for root, dirs, files in os.walk(path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        event_handler.process_file(file_path)
-            else:
+            logger.info(f"Performing initial scan of: {os.path.abspath(path)}", category=CATEGORY_STATUS)
+            if not os.path.exists(path):
                 logger.warning(f"Path not found: {path}")
+                continue
+            reason = self.path_filter.check_dir(path)
+            if reason:
+                logger.info(f"Not scanning {path}: {reason}")
+            else:
+                roots.append(path)
+
+        # Excluded folders are skipped without being listed; files stream in while the crawl runs
+        crawler = Crawler(self.path_filter, workers=crawl_workers)
+        for file_path, st in crawler.crawl(roots):
+            # Cheap stat check against the index before queueing anything
+            if self.index and self.event_handler.is_indexed(file_path, st):
+                unchanged += 1
+                continue
+            batch.append(file_path)
+            if len(batch) >= batch_size:
+                self.queue_scan_batch(batch)
+                batch = []
+
+        if batch:
+            self.queue_scan_batch(batch)
+
+        # Wait for the workers to drain what we queued
+        self.executor.wait_idle()
+        if self.index:
+            self.index.flush()
         
         if not specific_path:
-            logger.info("Initial scan completed.")
+            if unchanged:
+                logger.info(f"Skipped {unchanged} unchanged files.")
+            gate = self.detector.ner_gate.stats()
+            if gate["skipped"]:
+                logger.info(f"NLP pre-filter skipped {gate['skipped']} of {gate['checked']} texts.")
+            if self.detector.ner_loading:
+                logger.info("NLP model still loading, NLP scanning will follow once it is ready.")
+            logger.info("Initial scan completed.", category=CATEGORY_STATUS)
 
     def add_path(self, path):
         """Dynamically adds a new path to the monitor."""
@@ -124,12 +627,11 @@ class SystemMonitor:
             logger.warning(f"Cannot add path, not a directory: {path}")
             return
 
-        logger.info(f"Adding new monitoring path: {path}")
+        logger.info(f"Adding new monitoring path: {path}", category=CATEGORY_FILE)
         self.watch_paths.append(path)
         
-        # Schedule the observer
-        event_handler = FileEventHandler(self.detector)
-        self.observer.schedule(event_handler, path, recursive=True)
+        # Only this tree is added to the running observer
+        self._schedule(path)
         
         # Perform initial scan for this new path
         self.scan_existing_files(specific_path=path)
@@ -141,34 +643,47 @@ class SystemMonitor:
             logger.warning(f"Path not found in monitor list: {path}")
             return
 
-        logger.info(f"Removing monitoring path: {path}")
+        logger.info(f"Removing monitoring path: {path}", category=CATEGORY_FILE)
         self.watch_paths.remove(path)
         
-        # Watchdog doesn't easily support removing one watch. 
-        # We have to restart the observer with the remaining paths.
-        self.stop_filesystem_monitor()
-        self.start_filesystem_monitor()
+        # Drops just this tree's watches; the other paths keep receiving events
+        self._unschedule(path)
+
+    def _schedule(self, path):
+        with self.watch_lock:
+            if path not in self.watches:
+                self.watches[path] = self.observer.schedule(self.event_handler, path, recursive=True)
+
+    def _unschedule(self, path):
+        with self.watch_lock:
+            watch = self.watches.pop(path, None)
+            if watch is None:
+                return
+            try:
+                self.observer.unschedule(watch)
+            except KeyError:
+                # Already gone (e.g. the emitter stopped when the drive was unmounted)
+                pass
 
     def start_filesystem_monitor(self):
         if self.observer.is_alive():
              # Already running
              return
 
-        # Re-create observer in case it was stopped
-        self.observer = Observer()
-        event_handler = FileEventHandler(self.detector)
+        # Re-create observer in case it was stopped (a stopped thread can't be restarted)
+        with self.watch_lock:
+            self.observer = Observer()
+            self.watches = {}
         
-        assigned_watch = False
         for path in self.watch_paths:
             if os.path.isdir(path):
-                self.observer.schedule(event_handler, path, recursive=True)
-                logger.info(f"File system monitor started on: {os.path.abspath(path)}")
-                assigned_watch = True
+                self._schedule(path)
+                logger.info(f"File system monitor started on: {os.path.abspath(path)}", category=CATEGORY_FILE)
             else:
                 logger.warning(f"Directory not found, skipping: {path}")
         
-        if assigned_watch:
-            self.observer.start()
+        # Started even with nothing to watch, so add_path() can schedule into it later
+        self.observer.start()
 
     def stop_filesystem_monitor(self):
         if self.observer.is_alive():
@@ -176,34 +691,53 @@ class SystemMonitor:
             self.observer.join()
 
     def start_clipboard_monitor(self, interval=1.0):
-        logger.info("Clipboard monitor started.")
+        if self.clipboard_backend is None:
+            self.clipboard_backend = create_clipboard_backend(interval)
+        backend = self.clipboard_backend
+        logger.info(f"Clipboard monitor started ({backend.name}).", category=CATEGORY_CLIPBOARD)
         
         # Perform initial file scan now that everything is started
         self.scan_existing_files()
 
         self.running = True
-        last_content = ""
+        # Hash of the last text, so a big clipboard isn't kept around just to compare
+        last_key = None
+        # Clipboard text that was only Regex-scanned because the model was loading
+        ner_pending = None
         
         try:
             while self.running:
-                content = pyperclip.paste()
-                if content != last_content:
-                    last_content = content
-                    if content.strip():
-                        # Scan new clipboard content
-                        matches = self.detector.scan_text(content)
+                # Short timeout so a stop request is noticed quickly
+                if backend.wait_for_change(timeout=0.5):
+                    content = backend.read() or ""
+                    key = content_hash(content)
+                    changed, last_key = key != last_key, key
+                    if changed and content.strip():
+                        # Scan new clipboard content (unless the same text was scanned before)
+                        matches = self.result_cache.get(key)
+                        ner_pending = None
+                        if matches is None:
+                            final = not self.detector.ner_loading
+                            if not final:
+                                ner_pending = content
+                            matches = self.detector.scan_text(content)
+                            if final:
+                                self.result_cache.put(key, matches)
                         if matches:
-                            logger.log_batch(source="Clipboard", matches=matches)
+                            logger.log_batch(source="Clipboard", matches=matches, category=CATEGORY_CLIPBOARD)
                                 
                             # Optional: Clear clipboard if sensitive?
                             # pyperclip.copy("") 
-                            
-                time.sleep(interval)
+                elif ner_pending and self.detector.ner_ready:
+                    matches = self.detector.scan_ner(ner_pending)
+                    ner_pending = None
+                    if matches:
+                        logger.log_batch(source="Clipboard", matches=matches, category=CATEGORY_CLIPBOARD)
         except KeyboardInterrupt:
              # Allow KeyboardInterrupt to propagate up to main menu
              raise
         except Exception as e:
-            logger.error(f"Clipboard Error: {e}")
+            logger.error(f"Clipboard Error: {e}", category=CATEGORY_CLIPBOARD)
 
     def start_all(self):
         self.start_filesystem_monitor()
@@ -214,11 +748,11 @@ class SystemMonitor:
         if self.usb_thread_running:
             return
 
-        logger.info("External Drive Scanner started. Waiting for USB...")
+        logger.info("External Drive Scanner started. Waiting for USB...", category=CATEGORY_USB)
         self.usb_thread_running = True
         
         # Initialize known drives
-        current_drives = get_removable_drives()
+        current_drives = self.drives.refresh()
         for d in current_drives:
             self.known_drives.add(d)
             self.add_path(d)
@@ -232,24 +766,50 @@ class SystemMonitor:
             self.usb_thread_running = False
             if self.usb_thread:
                 self.usb_thread.join(timeout=1.0)
-            logger.info("External Drive Scanner stopped.")
+            logger.info("External Drive Scanner stopped.", category=CATEGORY_USB)
 
     def _poll_usb_drives(self, interval):
+        # On Linux, sleep until something is mounted instead of polling
+        watcher = create_mount_watcher()
         while self.usb_thread_running:
             try:
-                current_drives = get_removable_drives()
+                if watcher is not None:
+                    # Short waits so stop_usb_monitor isn't kept waiting
+                    if not watcher.wait(timeout=1.0):
+                        continue
+                current_drives = self.drives.refresh()
                 for drive in current_drives:
                     if drive not in self.known_drives:
-                        logger.info(f"New external drive detected: {drive}")
+                        logger.info(f"New external drive detected: {drive}", category=CATEGORY_USB)
                         self.add_path(drive) 
                         self.known_drives.add(drive)
-                time.sleep(interval)
+                # Unplugged drives: only their own watches are dropped
+                for drive in self.known_drives - set(current_drives):
+                    logger.info(f"External drive removed: {drive}", category=CATEGORY_USB)
+                    self.known_drives.discard(drive)
+                    if drive in self.watch_paths:
+                        self.remove_path(drive)
+                if watcher is None:
+                    time.sleep(interval)
             except Exception as e:
-                logger.error(f"USB Polling Error: {e}")
+                logger.error(f"USB Polling Error: {e}", category=CATEGORY_USB)
                 time.sleep(interval)
+        if watcher is not None:
+            watcher.close()
 
     def stop(self):
         self.running = False
         self.stop_filesystem_monitor()
         self.stop_usb_monitor()
+        self.scheduler.stop()
+        self.executor.shutdown()
+        if self.ner_pool:
+            self.ner_pool.shutdown()
+        if self.documents:
+            self.documents.shutdown()
+        if self.index:
+            self.index.flush()
+        self.result_cache.flush()
+        if self.findings:
+            logger.flush()
         logger.info("Monitors stopped.")
@@ -0,0 +1,243 @@
+import os
+import re
+import json
+from .archive_scanner import ARCHIVE_EXTENSIONS, TEXT_EXTENSIONS
+from .extractors import document_extensions
+
+# This program's own folders; excluded only here, not wherever a folder is called 'src' or 'docs'
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Text formats, archives whose text members are scanned (see archive_scanner.py)
+# and documents whose text is extracted (see extractors.py)
+DEFAULT_EXTENSIONS = tuple(dict.fromkeys(TEXT_EXTENSIONS + ARCHIVE_EXTENSIONS + document_extensions()))
+DEFAULT_EXCLUDE = (
+    # Tool and editor folders
+    '.git/', '.vscode/', '__pycache__/', '.venv/', 'env/', '.gemini/',
+    # Our own files
+    'dlp_log.log', 'requirements.txt', 'task.md', 'implementation_plan.md',
+    'walkthrough.md', 'verify_setup.py', 'monitor.py', 'detector.py',
+    'logger.py', 'main.py',
+    APP_DIR.replace(os.sep, '/').rstrip('/') + '/src/',
+    APP_DIR.replace(os.sep, '/').rstrip('/') + '/docs/',
+)
+
+_GLOB_CHARS = re.compile(r'[*?\[]')
+
+def glob_to_regex(glob):
+    """Translates one gitignore-style glob (no slashes handling) to a regex string."""
+    out = []
+    i = 0
+    n = len(glob)
+    while i < n:
+        c = glob[i]
+        if c == '*':
+            if glob[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if glob[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = glob.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end + 1
+                continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+class _Rule:
+    def __init__(self, pattern, case_insensitive=False):
+        self.pattern = pattern
+        self.reason = f"excluded by '{pattern}'"
+        self.negate = pattern.startswith('!')
+        glob = pattern[1:] if self.negate else pattern
+        if case_insensitive:
+            glob = glob.lower()
+        self.dir_only = glob.endswith('/')
+        glob = glob.rstrip('/')
+        # Starts at the filesystem root ('/data/x', or 'C:/data/x' on Windows)
+        self.rooted = glob.startswith('/') or os.path.isabs(glob)
+        self.glob = glob if self.rooted else glob.lstrip('/')
+        # No slash inside: matches a file or folder name at any depth
+        self.name_only = '/' not in self.glob
+        self.literal = not _GLOB_CHARS.search(self.glob)
+
+        prefix = '^' if self.rooted else '(?:^|/)'
+        # Folder rules match an ancestor (followed by '/'), others the path or an ancestor
+        suffix = '/' if self.dir_only else '(?:/|$)'
+        self.regex = re.compile(prefix + glob_to_regex(self.glob) + suffix)
+
+class PathFilter:
+    """
+    Decides which files are scanned, from gitignore-style patterns, an extension
+    list and size limits. Everything is compiled once: plain names go into sets,
+    globs into one combined regex, so a check is a couple of set lookups and at
+    most one regex search. check() says why a path is excluded.
+
+    Patterns: 'name' matches a file or folder anywhere, 'dir/' only folders,
+    'a/b/*.txt' a trailing part of the path, '/abs/path' from the root, '**' any
+    number of folders, and '!pattern' brings back something excluded before.
+    """
+    def __init__(self, exclude=DEFAULT_EXCLUDE, extensions=DEFAULT_EXTENSIONS,
+                 max_size=None, min_size=None):
+        self.case_insensitive = os.path.normcase('A') == 'a'
+        self.rules = [_Rule(p.strip(), self.case_insensitive) for p in exclude
+                      if p.strip() and not p.startswith('#')]
+        self.extensions = tuple(e.lower() for e in extensions) if extensions else None
+        self.max_size = max_size
+        self.min_size = min_size
+        # Rules with a full path need absolute paths to compare with
+        self.absolute = any(r.rooted for r in self.rules)
+
+        # Negations need the rules in order (last match wins); otherwise use the fast tables
+        self.ordered = any(r.negate for r in self.rules)
+        # Lookup tables map to the reason string, built once
+        self.file_names = {}    # plain name
+        self.dir_names = {}     # plain folder name
+        self.prefixes = {}      # plain full path + '/'
+        self.exact = {}         # plain full file path
+        rooted_globs = []
+        globs = []
+        for rule in self.rules:
+            if rule.literal and rule.rooted:
+                self.prefixes.setdefault(rule.glob + '/', rule.reason)
+                if not rule.dir_only:
+                    self.exact.setdefault(rule.glob, rule.reason)
+            elif rule.literal and rule.name_only:
+                self.dir_names.setdefault(rule.glob, rule.reason)
+                if not rule.dir_only:
+                    self.file_names.setdefault(rule.glob, rule.reason)
+            elif rule.rooted:
+                rooted_globs.append(rule)
+            else:
+                globs.append(rule)
+        self.dir_name_set = frozenset(self.dir_names)
+        self.prefix_tuple = tuple(self.prefixes)
+        # Rooted globs only need to be tried at the start of the path
+        self.rooted_regex, self.rooted_rules = self._combine(rooted_globs)
+        self.glob_regex, self.glob_rules = self._combine(globs)
+
+    @staticmethod
+    def _combine(rules):
+        """One regex for many rules; the group that matched tells which rule it was."""
+        if not rules:
+            return None, []
+        return re.compile('|'.join(f'({r.regex.pattern})' for r in rules)), rules
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Loads a JSON config: {"exclude": [...], "extensions": [...], "max_size": N,
+        "min_size": N, "default_excludes": true}. Excludes add to the defaults
+        unless default_excludes is false.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        exclude = list(config.get('exclude', []))
+        if config.get('default_excludes', True):
+            exclude = list(DEFAULT_EXCLUDE) + exclude
+        return cls(exclude=exclude, extensions=config.get('extensions', DEFAULT_EXTENSIONS),
+                   max_size=config.get('max_size'), min_size=config.get('min_size'))
+
+    def _normalize(self, path):
+        if self.absolute and not os.path.isabs(path):
+            path = os.path.abspath(path)
+        if os.sep != '/':
+            path = path.replace(os.sep, '/')
+        if self.case_insensitive:
+            path = path.lower()
+        return path
+
+    def check(self, path, size=None, parents_checked=False):
+        """
+        None if the file should be scanned, otherwise the reason it isn't.
+        parents_checked: the folders above were already let through (crawler).
+        """
+        path = self._normalize(path)
+        name = path[path.rfind('/') + 1:]
+
+        if self.extensions is not None and not name.lower().endswith(self.extensions):
+            return "extension not included"
+        reason = self._excluded(path, name, is_dir=False, parents_checked=parents_checked)
+        if reason:
+            return reason
+        if size is not None:
+            return self.check_size(size)
+        return None
+
+    def check_dir(self, path, parents_checked=False):
+        """None if the folder should be crawled, otherwise the reason it isn't."""
+        path = self._normalize(path).rstrip('/')
+        return self._excluded(path, path[path.rfind('/') + 1:], is_dir=True, parents_checked=parents_checked)
+
+    def check_size(self, size):
+        if self.max_size is not None and size > self.max_size:
+            return f"larger than {self.max_size} bytes"
+        if self.min_size is not None and size < self.min_size:
+            return f"smaller than {self.min_size} bytes"
+        return None
+
+    def allows(self, path):
+        return self.check(path) is None
+
+    def _excluded(self, path, name, is_dir, parents_checked=False):
+        if self.ordered:
+            return self._excluded_ordered(path, is_dir)
+
+        # A folder is matched with a trailing '/', like the folders above a file
+        subject = path + '/' if is_dir else path
+        names = self.dir_names if is_dir else self.file_names
+        if name in names:
+            return names[name]
+        if not is_dir and path in self.exact:
+            return self.exact[path]
+        # Any folder on the way
+        if self.dir_name_set and not parents_checked:
+            for part in path.split('/')[:-1]:
+                if part in self.dir_name_set:
+                    return self.dir_names[part]
+        if self.prefix_tuple and subject.startswith(self.prefix_tuple):
+            return next(self.prefixes[p] for p in self.prefix_tuple if subject.startswith(p))
+        if self.rooted_regex is not None:
+            m = self.rooted_regex.match(subject)
+            if m:
+                return self.rooted_rules[m.lastindex - 1].reason
+        if self.glob_regex is not None:
+            m = self.glob_regex.search(subject)
+            if m:
+                return self.glob_rules[m.lastindex - 1].reason
+        return None
+
+    def _excluded_ordered(self, path, is_dir):
+        subject = path + '/' if is_dir else path
+        verdict = None
+        for rule in self.rules:
+            if rule.regex.search(subject):
+                verdict = None if rule.negate else rule.reason
+        return verdict
+
+if __name__ == "__main__":
+    # python -m src.path_filter [--config filter.json] PATH...   -> why each path is (not) scanned
+    import sys
+    args = sys.argv[1:]
+    path_filter = PathFilter()
+    if args[:1] == ['--config']:
+        path_filter = PathFilter.from_file(args[1])
+        args = args[2:]
+    for p in args:
+        size = os.path.getsize(p) if os.path.isfile(p) else None
+        reason = path_filter.check_dir(p) if os.path.isdir(p) else path_filter.check(p, size)
+        print(f"{p}: {reason or 'scanned'}")
@@ -0,0 +1,78 @@
+import re
+import threading
+
+# Cheap signals computed with C-speed regex calls, no per-character Python loop
+_LETTERS = re.compile(r'[^\W\d_]+')
+_CAPITALIZED = re.compile(r'\b[A-Z][a-zA-Z]')
+# MONEY entities don't need capitals ("$500", "10 dollars")
+_CURRENCY_SYMBOLS = ('$', '€', '£', '¥')
+_CURRENCY_WORDS = ('dollar', 'euro', 'pound', 'usd', 'eur', 'gbp')
+
+class NERGate:
+    """
+    Pre-screen that decides whether a text is worth sending to spacy.
+    PERSON/ORG/GPE entities need capitalized words, MONEY needs a currency cue;
+    numeric CSVs, JSON booleans, hex dumps etc. have neither and are skipped.
+    """
+    def __init__(self, enabled=True, min_length=8, min_alpha_ratio=0.2,
+                 min_capitalized=1, min_capitalized_per_kb=0.2):
+        self.enabled = enabled
+        self.min_length = min_length
+        # Share of the text that must be letters
+        self.min_alpha_ratio = min_alpha_ratio
+        self.min_capitalized = min_capitalized
+        # Capitalized words per 1000 characters
+        self.min_capitalized_per_kb = min_capitalized_per_kb
+
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.skipped = 0
+
+    def config(self):
+        """Settings as a string, part of the detector version (they change the findings)."""
+        if not self.enabled:
+            return "off"
+        return (f"{self.min_length}:{self.min_alpha_ratio}:"
+                f"{self.min_capitalized}:{self.min_capitalized_per_kb}")
+
+    def allows(self, text):
+        """True if NER should run on this text."""
+        if not self.enabled:
+            return True
+
+        allowed = self._check(text)
+        with self.lock:
+            self.checked += 1
+            if not allowed:
+                self.skipped += 1
+        return allowed
+
+    def _check(self, text):
+        n = len(text)
+        if n < self.min_length:
+            return False
+
+        # Plain substring checks run at C speed
+        if any(c in text for c in _CURRENCY_SYMBOLS):
+            return True
+
+        letters = n - len(_LETTERS.sub('', text))
+        if letters < n * self.min_alpha_ratio:
+            return False
+
+        lowered = text.lower()
+        if any(w in lowered for w in _CURRENCY_WORDS):
+            return True
+
+        # Stop counting as soon as there are enough capitalized words
+        needed = max(self.min_capitalized, n * self.min_capitalized_per_kb / 1000)
+        capitalized = 0
+        for _ in _CAPITALIZED.finditer(text):
+            capitalized += 1
+            if capitalized >= needed:
+                return True
+        return False
+
+    def stats(self):
+        with self.lock:
+            return {"checked": self.checked, "skipped": self.skipped}
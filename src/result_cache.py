@@ -0,0 +1,134 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Optional faster hash (pip install xxhash); blake2b is used otherwise
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+def new_hasher():
+    """Incremental content hasher (update() / hexdigest())."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+def content_hash(data):
+    """Hash of bytes (or text, hashed as UTF-8) used to recognize content seen before."""
+    if isinstance(data, str):
+        data = data.encode('utf-8', 'surrogatepass')
+    hasher = new_hasher()
+    hasher.update(data)
+    return hasher.hexdigest()
+
+def _entry_size(findings):
+    # Rough memory cost of a cached result
+    return 200 + sum(150 + len(m.get('value', '')) for m in findings)
+
+class ResultCache:
+    """
+    Scan results by content hash, so the same content (a file copied to a USB stick,
+    a duplicate download, text pasted again) is only scanned once per detector version.
+    In memory it's an LRU bounded by `max_bytes`; with `path` set, results are also
+    kept in a SQLite file and survive restarts.
+    """
+    def __init__(self, detector_version, max_bytes=32 * 1024 * 1024, path=None, commit_every=200):
+        self.detector_version = detector_version
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+        self.conn = None
+        self.commit_every = commit_every
+        self.uncommitted = 0
+        if path:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    hash TEXT,
+                    detector_version TEXT,
+                    findings TEXT,
+                    stored_at REAL,
+                    PRIMARY KEY (hash, detector_version)
+                )""")
+            self.conn.execute("DELETE FROM results WHERE detector_version != ?", (detector_version,))
+            self.conn.commit()
+
+    def get(self, key):
+        """Cached findings for a content hash (a fresh copy), or None."""
+        with self.lock:
+            findings = self.entries.get(key)
+            if findings is not None:
+                self.entries.move_to_end(key)
+            elif self.conn is not None:
+                row = self.conn.execute("SELECT findings FROM results WHERE hash=? AND detector_version=?",
+                                        (key, self.detector_version)).fetchone()
+                if row:
+                    findings = json.loads(row[0])
+                    self._remember(key, findings)
+
+            if findings is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [dict(m) for m in findings]
+
+    def put(self, key, findings):
+        findings = [dict(m) for m in findings]
+        with self.lock:
+            if key in self.entries:
+                return
+            self._remember(key, findings)
+            if self.conn is not None:
+                self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                  (key, self.detector_version, json.dumps(findings), time.time()))
+                self.uncommitted += 1
+                if self.uncommitted >= self.commit_every:
+                    self.conn.commit()
+                    self.uncommitted = 0
+
+    def _remember(self, key, findings):
+        size = _entry_size(findings)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = findings
+        self.size += size
+        while self.size > self.max_bytes:
+            _, old = self.entries.popitem(last=False)
+            self.size -= _entry_size(old)
+            self.evicted += 1
+
+    def set_version(self, detector_version):
+        """New detection rules: cached results no longer apply."""
+        with self.lock:
+            if detector_version == self.detector_version:
+                return
+            self.detector_version = detector_version
+            self.entries.clear()
+            self.size = 0
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM results")
+                self.conn.commit()
+                self.uncommitted = 0
+
+    def flush(self):
+        with self.lock:
+            if self.conn is not None and self.uncommitted:
+                self.conn.commit()
+                self.uncommitted = 0
+
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.size, "hits": self.hits,
+                    "misses": self.misses, "evicted": self.evicted}
@@ -0,0 +1,192 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from .logger import logger
+from .path_filter import APP_DIR
+
+# Next to the program, not in the (watched) working directory
+DEFAULT_INDEX_PATH = os.path.join(APP_DIR, "scan_index.db")
+
+class ScanIndex:
+    """
+    On-disk record of what was already scanned:
+    path -> (size, mtime, inode, content hash, detector version, findings).
+    Lets restarts and resumes skip files that haven't changed.
+    Files scanned without NER (model loading or unavailable) are stored under
+    `regex_version`, so they are still known after a restart.
+    """
+    def __init__(self, db_path, detector_version, commit_every=200, regex_version=None):
+        self.db_path = db_path
+        self.detector_version = detector_version
+        self.regex_version = regex_version
+        self.commit_every = commit_every
+        self.lock = threading.Lock()
+        self.uncommitted = 0
+
+        # Counters so the skip rate can be checked
+        self.skipped = 0
+        self.scanned = 0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime INTEGER,
+                inode INTEGER,
+                content_hash TEXT,
+                detector_version TEXT,
+                findings TEXT,
+                scanned_at REAL
+            )""")
+        # How far append-only files (logs) were scanned, so only new bytes are read
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tails (path TEXT PRIMARY KEY, inode INTEGER, offset INTEGER)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        self._check_version()
+
+    def _check_version(self):
+        """Drops every entry when the detection rules changed since the index was written."""
+        row = self.conn.execute("SELECT value FROM meta WHERE key='detector_version'").fetchone()
+        # Same rules, with or without the NLP model
+        if row and row[0] in (self.detector_version, self.regex_version):
+            return
+        if row:
+            logger.info("Detection rules changed, scan index reset.")
+        self.conn.execute("DELETE FROM files")
+        self.conn.execute("DELETE FROM tails")
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('detector_version', ?)",
+                          (self.detector_version,))
+        self.conn.commit()
+
+    def set_version(self, detector_version, regex_version=None):
+        """Switches to new detection rules at runtime (drops the stale entries)."""
+        with self.lock:
+            if detector_version == self.detector_version:
+                return
+            if detector_version == self.regex_version:
+                # The NLP model is unavailable: entries scanned without it are fresh now
+                self.detector_version = detector_version
+                return
+            self.detector_version = detector_version
+            self.regex_version = regex_version
+            self._check_version()
+
+    def _lookup(self, path):
+        return self.conn.execute(
+            "SELECT size, mtime, inode, content_hash, detector_version FROM files WHERE path=?",
+            (path,)).fetchone()
+
+    def is_unchanged(self, path, st=None, regex_only=False):
+        """
+        True if size, mtime and inode still match what was scanned with the current rules.
+        regex_only: True if the file is unchanged but was scanned without NER.
+        """
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return False
+        with self.lock:
+            row = self._lookup(path)
+            if row is None:
+                return False
+            size, mtime, inode, _, version = row
+            wanted = self.regex_version if regex_only else self.detector_version
+            fresh = (size == st.st_size and mtime == st.st_mtime_ns
+                     and inode == st.st_ino and version == wanted)
+            if fresh:
+                self.skipped += 1
+        return fresh
+
+    def has_content(self, path, st, content_hash):
+        """
+        True if the file was touched but its content is the same as last scan.
+        The stored stat is refreshed so the next lookup is a cheap hit.
+        """
+        with self.lock:
+            row = self._lookup(path)
+            if row is None or row[3] != content_hash or row[4] != self.detector_version:
+                return False
+            self.conn.execute("UPDATE files SET size=?, mtime=?, inode=? WHERE path=?",
+                              (st.st_size, st.st_mtime_ns, st.st_ino, path))
+            self._maybe_commit()
+            self.skipped += 1
+        return True
+
+    def record(self, path, st, content_hash, findings, complete=True):
+        """
+        complete=False: NER didn't run, so the entry is only fresh once the
+        NLP model is known to be unavailable (see set_version).
+        """
+        with self.lock:
+            version = self.detector_version if complete else (self.regex_version or "")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, st.st_ino, content_hash,
+                 version, json.dumps(findings), time.time()))
+            self._maybe_commit()
+            self.scanned += 1
+
+    def findings(self, path):
+        """Returns the findings stored for a path (empty list if unknown)."""
+        with self.lock:
+            row = self.conn.execute("SELECT findings FROM files WHERE path=?", (path,)).fetchone()
+        return json.loads(row[0]) if row and row[0] else []
+
+    def tail_offset(self, path, st):
+        """
+        Where to resume scanning an append-only file. Returns 0 (scan from the start)
+        if the file is unknown, was rotated (new inode) or was truncated.
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT inode, offset FROM tails WHERE path=?", (path,)).fetchone()
+        if row is None:
+            return 0
+        inode, offset = row
+        if inode != st.st_ino:
+            logger.info(f"Log rotated, rescanning: {path}")
+            return 0
+        if st.st_size < offset:
+            logger.info(f"Log truncated, rescanning: {path}")
+            return 0
+        return offset
+
+    def set_tail(self, path, st, offset):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO tails VALUES (?, ?, ?)", (path, st.st_ino, offset))
+            self._maybe_commit()
+
+    def forget(self, path):
+        with self.lock:
+            self.conn.execute("DELETE FROM files WHERE path=?", (path,))
+            self.conn.execute("DELETE FROM tails WHERE path=?", (path,))
+            self._maybe_commit()
+
+    def clear(self):
+        """Forces a full rescan on the next start."""
+        with self.lock:
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("DELETE FROM tails")
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def _maybe_commit(self):
+        # Caller holds self.lock
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.conn.close()
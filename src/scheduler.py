@@ -0,0 +1,168 @@
+import os
+import time
+import heapq
+import threading
+from .logger import logger
+
+class DebouncedScheduler:
+    """
+    Coalesces bursts of file events into a single scan job per path.
+    A path is handed to the callback once it has been quiet for `settle_time`
+    seconds and its size/mtime stopped changing between two checks.
+
+    Memory stays bounded whatever the event rate: a path has at most one heap
+    entry, and once `max_pending` paths are waiting, events for new paths are
+    folded into one marker per folder, handed to `folder_callback` to rescan.
+    """
+    def __init__(self, callback, settle_time=0.5, max_wait=30.0, max_pending=100_000,
+                 folder_callback=None):
+        self.callback = callback
+        self.settle_time = settle_time
+        # Upper bound so a file that never stops growing is still scanned eventually
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.folder_callback = folder_callback
+
+        # {path: {"due": monotonic deadline, "queued": due of its heap entry, "first_seen": ...,
+        #         "signature": (size, mtime), "folder": True for a folder rescan marker}}
+        self.pending = {}
+        # Min-heap of (due, path). Newer events only move "due"; the entry is pushed back when popped.
+        self.heap = []
+        # Events folded into folder markers
+        self.overflowed = 0
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def _signature(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def submit(self, path):
+        """Registers an event for a path. Never blocks the caller for the settle window."""
+        now = time.monotonic()
+        signature = self._signature(path)
+        with self.cond:
+            entry = self.pending.get(path)
+            if entry is None and len(self.pending) >= self.max_pending and self.folder_callback:
+                self._add_folder(os.path.dirname(path), now)
+            elif entry is None:
+                entry = {"first_seen": now, "signature": signature, "due": now + self.settle_time}
+                self.pending[path] = entry
+                self._push(entry, path)
+            else:
+                entry["signature"] = signature
+                entry["due"] = now + self.settle_time
+
+        if not self.running:
+            self.start()
+
+    def _push(self, entry, path):
+        entry["queued"] = entry["due"]
+        heapq.heappush(self.heap, (entry["due"], path))
+        self.cond.notify()
+
+    def _add_folder(self, folder, now):
+        """Too many paths pending: the folder gets rescanned instead of tracking each file."""
+        self.overflowed += 1
+        entry = self.pending.get(folder)
+        if entry is not None:
+            return
+        if self.overflowed == 1:
+            logger.warning(f"Over {self.max_pending} files waiting to be scanned, rescanning folders instead")
+        entry = {"first_seen": now, "signature": None, "due": now + self.settle_time, "folder": True}
+        self.pending[folder] = entry
+        self._push(entry, folder)
+
+    def pending_count(self):
+        with self.cond:
+            return len(self.pending)
+
+    def start(self):
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+
+    def _next_due(self):
+        """Pops the next path whose deadline passed. Returns None after waiting."""
+        while self.heap:
+            due, path = self.heap[0]
+            entry = self.pending.get(path)
+            if entry is None or entry["queued"] != due:
+                # Left over from a path that was already handed out
+                heapq.heappop(self.heap)
+                continue
+            if entry["due"] > due:
+                # Newer events came in since: wait for the new deadline
+                heapq.heappop(self.heap)
+                self._push(entry, path)
+                continue
+
+            delay = due - time.monotonic()
+            if delay > 0:
+                self.cond.wait(delay)
+                return None
+            heapq.heappop(self.heap)
+            return path
+
+        self.cond.wait()
+        return None
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                path = self._next_due()
+                if path is None:
+                    continue
+                entry = self.pending[path]
+                expected = entry["signature"]
+                if entry.get("folder"):
+                    del self.pending[path]
+
+            if entry.get("folder"):
+                try:
+                    self.folder_callback(path)
+                except Exception as e:
+                    logger.error(f"Scheduler error for folder {path}: {e}")
+                continue
+
+            # Stat outside the lock so new events keep flowing in
+            current = self._signature(path)
+
+            with self.cond:
+                if self.pending.get(path) is not entry:
+                    continue
+                if current is None:
+                    # File vanished before it settled
+                    del self.pending[path]
+                    continue
+
+                waited = time.monotonic() - entry["first_seen"]
+                if current != expected and waited < self.max_wait:
+                    # Still being written, check again after another settle window
+                    entry["signature"] = current
+                    entry["due"] = time.monotonic() + self.settle_time
+                    self._push(entry, path)
+                    continue
+
+                del self.pending[path]
+
+            try:
+                self.callback(path)
+            except Exception as e:
+                logger.error(f"Scheduler error for {path}: {e}")
@@ -0,0 +1,176 @@
+import re
+import codecs
+
+# Optional: better guesses for text that isn't UTF-8 (pip install charset-normalizer)
+try:
+    from charset_normalizer import from_bytes
+except ImportError:
+    from_bytes = None
+
+# How much of a file is looked at to decide how to read it
+SNIFF_BYTES = 8192
+
+# What to do with binary content: 'skip' it, or scan its printable 'strings'
+BINARY_MODES = ('skip', 'strings')
+
+# UTF-32-LE first: its BOM starts with the UTF-16-LE one
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+)
+
+# Control bytes that don't show up in text (tab, newlines, form feed and ESC for colored logs do)
+_CONTROL = bytes(b for b in range(32) if b not in b'\t\n\v\f\r\x1b')
+
+# Printable ASCII, what `strings` keeps
+_PRINTABLE = bytes(range(0x20, 0x7f)) + b'\t'
+MIN_STRING = 6
+
+def sniff(head, complete=False):
+    """
+    Guesses the encoding from the first bytes of a file; None means binary.
+    A BOM is left in place: decoded with the endian-specific codec it becomes a
+    U+FEFF character, so byte offsets still count it. complete: head is the whole file.
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+    if b'\x00' in head:
+        return _utf16_without_bom(head)
+    # More than 10% control bytes
+    if len(head.translate(None, _CONTROL)) < len(head) * 0.9:
+        return None
+    try:
+        # A character cut at the end of the head is fine
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=complete)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    if from_bytes is not None:
+        best = from_bytes(head).best()
+        if best is not None:
+            return codecs.lookup(best.encoding).name
+    # Most non-UTF-8 text around is a Windows export
+    return 'cp1252'
+
+def _utf16_without_bom(head):
+    # ASCII-range text in UTF-16 has a zero in every other byte, and only there
+    even, odd = head[0::2], head[1::2]
+    if len(odd) >= 8:
+        if odd.count(0) > len(odd) * 0.2 and even.count(0) < len(even) * 0.02:
+            return 'utf-16-le'
+        if even.count(0) > len(even) * 0.2 and odd.count(0) < len(odd) * 0.02:
+            return 'utf-16-be'
+    return None
+
+def decode_errors(encoding):
+    """
+    Error handler for decoding. Undecodable UTF-8/cp1252 bytes are kept as lone
+    surrogates (offsets stay exact); other codecs get replacement characters.
+    """
+    return 'surrogateescape' if encoding in ('utf-8', 'cp1252') else 'replace'
+
+def code_unit(encoding):
+    """Size of one code unit; a line break can only start at a multiple of it."""
+    if encoding.startswith('utf-16'):
+        return 2
+    if encoding.startswith('utf-32'):
+        return 4
+    return 1
+
+def after_last_newline(data, encoding):
+    """Index just past the last line break in data (which starts on a code unit boundary), or -1."""
+    newline = '\n'.encode(encoding)
+    unit = code_unit(encoding)
+    nl = data.rfind(newline)
+    # '\n' inside a wider character, e.g. U+0A00 in UTF-16
+    while nl != -1 and nl % unit:
+        nl = data.rfind(newline, 0, nl + len(newline) - 1)
+    return nl + len(newline) if nl != -1 else -1
+
+def printable_strings(data, min_len=MIN_STRING, keep_start=False):
+    """
+    Runs of at least min_len printable ASCII characters, like the `strings` tool;
+    every other byte becomes a newline, so the result is as long as data and byte
+    offsets still point into the file. keep_start: data continues a kept run.
+    """
+    out = bytearray(b'\n' * len(data))
+    if keep_start:
+        lead = len(data) - len(data.lstrip(_PRINTABLE))
+        out[:lead] = data[:lead]
+    for m in _string_pattern(min_len).finditer(data):
+        out[m.start():m.end()] = m.group()
+    return bytes(out)
+
+_patterns = {}
+
+def _string_pattern(min_len):
+    pattern = _patterns.get(min_len)
+    if pattern is None:
+        pattern = _patterns[min_len] = re.compile(rb'[\x20-\x7e\t]{%d,}' % min_len)
+    return pattern
+
+class StringsReader:
+    """
+    Binary stream -> printable_strings() of it, read by read.
+    A run cut at the end of a read is completed before it's decided on.
+    """
+    def __init__(self, stream, min_len=MIN_STRING):
+        self.stream = stream
+        self.min_len = min_len
+        # The last read ended inside a kept run
+        self.open_run = False
+
+    def read(self, n=-1):
+        data = self.stream.read(n)
+        while data:
+            tail = len(data) - len(data.rstrip(_PRINTABLE))
+            if not 0 < tail < self.min_len or tail == len(data) and self.open_run:
+                break
+            more = self.stream.read(self.min_len)
+            if not more:
+                break
+            data += more
+        out = printable_strings(data, self.min_len, keep_start=self.open_run)
+        if data:
+            self.open_run = out[-1:] != b'\n'
+        return out
+
+    def readable(self):
+        return True
+
+class _Prefixed:
+    """Stream that gives back `head` (already read for sniffing) before the rest."""
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def read(self, n=-1):
+        if not self.head:
+            return self.stream.read(n)
+        if n is None or n < 0:
+            data, self.head = self.head + self.stream.read(), b""
+        else:
+            data, self.head = self.head[:n], self.head[n:]
+        return data
+
+    def readable(self):
+        return True
+
+def open_text(stream, binary_mode='skip'):
+    """
+    Sniffs a binary stream at its start. Returns (stream, encoding) ready for
+    detector.scan_stream, or None for binary content in 'skip' mode. In 'strings'
+    mode binary content comes back as a StringsReader.
+    """
+    head = stream.read(SNIFF_BYTES)
+    encoding = sniff(head, complete=len(head) < SNIFF_BYTES)
+    stream = _Prefixed(head, stream)
+    if encoding is None:
+        if binary_mode != 'strings':
+            return None
+        return StringsReader(stream), 'utf-8'
+    return stream, encoding
@@ -1,7 +1,11 @@
 import os
+import re
 import sys
+import time
 import ctypes
+import select
 import string
+import threading
 
 def get_available_drives():
     """Returns a list of available drive letters (e.g. ['C:\\', 'D:\\'])."""
@@ -13,21 +17,195 @@ def get_available_drives():
         bitmask >>= 1
     return drives
 
-def get_removable_drives():
+def windows_removable_drives():
     """Returns a list of drive letters that are removable (USB)."""
     removable_drives = []
-    
+
     # Windows Drive Type Constants
     DRIVE_REMOVABLE = 2
-    
+
     drives = get_available_drives()
     for drive in drives:
         drive_type = ctypes.windll.kernel32.GetDriveTypeW(drive)
         if drive_type == DRIVE_REMOVABLE:
             removable_drives.append(drive)
-            
+
     return removable_drives
 
+# --- Linux ---
+_OCTAL_ESCAPE = re.compile(r'\\([0-7]{3})')
+
+def parse_mountinfo(path="/proc/self/mountinfo"):
+    """Yields (major:minor, mount point, fs type) for every mount."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 7 or '-' not in fields:
+                continue
+            sep = fields.index('-', 6)
+            # Spaces etc. in mount points are written as \040
+            mount_point = _OCTAL_ESCAPE.sub(lambda m: chr(int(m.group(1), 8)), fields[4])
+            yield fields[2], mount_point, fields[sep + 1] if sep + 1 < len(fields) else ""
+
+def _read(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+def linux_removable_disks(sys_root="/sys"):
+    """Names of block devices that are removable or attached over USB (e.g. {'sdb'})."""
+    disks = set()
+    block = os.path.join(sys_root, "block")
+    try:
+        names = os.listdir(block)
+    except OSError:
+        return disks
+    for name in names:
+        # USB hard drives often report removable=0, so the bus counts too
+        if (_read(os.path.join(block, name, "removable")) == "1"
+                or f"{os.sep}usb" in os.path.realpath(os.path.join(block, name))):
+            disks.add(name)
+    return disks
+
+def _disk_of(sys_root, dev):
+    """Whole-disk name for a major:minor device number ('8:17' -> 'sdb')."""
+    parts = os.path.realpath(os.path.join(sys_root, "dev", "block", dev)).split(os.sep)
+    if "block" not in parts:
+        return None
+    i = len(parts) - 1 - parts[::-1].index("block")
+    return parts[i + 1] if i + 1 < len(parts) else None
+
+def linux_removable_drives(sys_root="/sys", mountinfo="/proc/self/mountinfo"):
+    """Mount points of filesystems that live on removable/USB disks."""
+    disks = linux_removable_disks(sys_root)
+    if not disks:
+        return []
+    drives = []
+    for dev, mount_point, _ in parse_mountinfo(mountinfo):
+        if mount_point not in drives and _disk_of(sys_root, dev) in disks:
+            drives.append(mount_point)
+    return drives
+
+# --- macOS ---
+def macos_removable_drives(volumes="/Volumes"):
+    """Mounted volumes other than the startup disk (which links back to /)."""
+    drives = []
+    try:
+        names = sorted(os.listdir(volumes))
+    except OSError:
+        return drives
+    for name in names:
+        path = os.path.join(volumes, name)
+        if os.path.ismount(path) and os.path.realpath(path) != "/":
+            drives.append(path)
+    return drives
+
+def get_removable_drives():
+    """Returns the mount points (drive letters on Windows) of removable drives."""
+    if sys.platform == "win32":
+        return windows_removable_drives()
+    if sys.platform == "darwin":
+        return macos_removable_drives()
+    return linux_removable_drives()
+
+def _path_parts(path):
+    path = os.path.normcase(path)
+    return path.rstrip("\\/").split(os.sep) if path.rstrip("\\/") else [""]
+
+class RemovableDrives:
+    """
+    Cached answer to "is this path on a removable drive?".
+    The drive list is refreshed at most every `ttl` seconds (or on invalidate(),
+    e.g. after a mount event) and kept in a prefix tree of path components,
+    so classifying a path costs a few dict lookups instead of a system query.
+    """
+    def __init__(self, lister=get_removable_drives, ttl=5.0):
+        self.lister = lister
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.tree = {}
+        self.drives = []
+        self.refreshed_at = None
+
+    def refresh(self):
+        try:
+            drives = self.lister()
+        except Exception:
+            drives = []
+        tree = {}
+        for drive in drives:
+            node = tree
+            for part in _path_parts(drive):
+                node = node.setdefault(part, {})
+            node[None] = drive
+        with self.lock:
+            self.drives = drives
+            self.tree = tree
+            self.refreshed_at = time.monotonic()
+        return drives
+
+    def invalidate(self):
+        with self.lock:
+            self.refreshed_at = None
+
+    def current(self):
+        """The removable drives (refreshed if the cached list is stale)."""
+        refreshed_at = self.refreshed_at
+        if refreshed_at is None or time.monotonic() - refreshed_at > self.ttl:
+            return self.refresh()
+        return self.drives
+
+    def drive_for(self, path):
+        """Mount point of the removable drive holding `path`, or None."""
+        self.current()
+        if not os.path.isabs(path):
+            path = os.path.abspath(path)
+        node = self.tree
+        found = node.get(None)
+        for part in _path_parts(path):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+    def is_removable(self, path):
+        return self.drive_for(path) is not None
+
+class MountWatcher:
+    """
+    Wakes up when something is mounted or unmounted: the kernel flags
+    /proc/self/mountinfo with POLLPRI whenever the mount table changes.
+    (A USB stick is only usable once mounted, so this fires at the right time.)
+    """
+    def __init__(self, mountinfo="/proc/self/mountinfo"):
+        self.file = open(mountinfo, 'rb')
+        self.poller = select.poll()
+        self.poller.register(self.file, select.POLLPRI | select.POLLERR)
+
+    def wait(self, timeout):
+        """True if the mount table changed within `timeout` seconds."""
+        # Each change is reported once per open file
+        return bool(self.poller.poll(timeout * 1000))
+
+    def close(self):
+        self.file.close()
+
+def create_mount_watcher():
+    """MountWatcher on Linux, None elsewhere (callers poll instead)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return MountWatcher()
+    except (OSError, AttributeError):
+        return None
+
+# Shared by the file handler and the USB monitor
+removable_drives = RemovableDrives()
+
 if __name__ == "__main__":
-    print(f"Available Drives: {get_available_drives()}")
+    if sys.platform == "win32":
+        print(f"Available Drives: {get_available_drives()}")
     print(f"Removable Drives (USB): {get_removable_drives()}")
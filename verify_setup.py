@@ -31,5 +31,147 @@ def test_detector():
         print("FAILURE: Did not detect PII.")
         sys.exit(1)
 
+def test_card_scanner():
+    print("\nTesting Credit Card scanner...")
+    import time
+    from src.card_scanner import find_card_numbers
+
+    text = "Card 4111 1111 1111 1111, order 1234567890123456, amex 3782-822463-10005."
+    found = [text[s:e] for s, e in find_card_numbers(text)]
+    print(f"Matches: {found}")
+    if found != ["4111 1111 1111 1111", "3782-822463-10005"]:
+        print("FAILURE: Wrong card numbers detected.")
+        sys.exit(1)
+
+    # Inputs that made the old regex backtrack for seconds per line
+    adversarial = ["1 " * 50000, "4 " * 50000, "4-" * 50000, "4 - " * 30000, "4" * 100000,
+                   "4111 1111 1111 111" * 5000 + "x"]
+    for sample in adversarial:
+        start = time.perf_counter()
+        list(find_card_numbers(sample))
+        took = time.perf_counter() - start
+        if took > 2.0:
+            print(f"FAILURE: {len(sample)} chars of {sample[:8]!r}... took {took:.2f}s")
+            sys.exit(1)
+    print("SUCCESS: Card scanner is fast on adversarial input.")
+
+def test_stream_boundaries():
+    print("\nTesting chunked scanning across chunk boundaries...")
+    import io
+    import random
+    from src.detector import DEFAULT_PATTERNS
+
+    detector = PII_Detector(lazy=True)
+    random.seed(1)
+    lines = [f"row {i} contact john.doe{random.randint(1000, 9999)}@example.com ok" for i in range(300)]
+    text = "\n".join(lines) + "\n"
+    for encoding in ("utf-8", "utf-16-le"):
+        data = text.encode(encoding)
+        expected = [(m.group(), len(text[:m.start()].encode(encoding)))
+                    for m in DEFAULT_PATTERNS["EMAIL"].finditer(text)]
+        # Byte chunk sizes that cut emails in all kinds of places
+        for chunk_size in (97, 1000, 4099):
+            found = [(m["value"], m["offset"]) for m in
+                     detector.scan_stream(io.BytesIO(data), chunk_size=chunk_size, overlap=64,
+                                          encoding=encoding)
+                     if m["type"] == "EMAIL"]
+            if found != expected:
+                extra = sorted(set(found) - set(expected))[:3]
+                missing = sorted(set(expected) - set(found))[:3]
+                print(f"FAILURE: {encoding}, chunks of {chunk_size}: extra {extra}, missing {missing}")
+                sys.exit(1)
+    print("SUCCESS: Every email found once, with its byte offset.")
+
+def test_usb_detection():
+    print("\nTesting removable drive detection (fake sysfs)...")
+    import tempfile
+    from src.usb_detector import linux_removable_drives, RemovableDrives
+
+    with tempfile.TemporaryDirectory() as root:
+        sys_root = os.path.join(root, "sys")
+        # sda: internal disk, sdb: USB stick with one partition, sdc: USB disk reporting removable=0
+        for disk, bus, removable in (("sda", "pci0000:00/ata1", "0"),
+                                     ("sdb", "pci0000:00/usb1/1-1", "1"),
+                                     ("sdc", "pci0000:00/usb2/2-1", "0")):
+            device = os.path.join(sys_root, "devices", bus, "block", disk)
+            os.makedirs(os.path.join(device, disk + "1"))
+            with open(os.path.join(device, "removable"), "w") as f:
+                f.write(removable + "\n")
+            os.makedirs(os.path.join(sys_root, "block"), exist_ok=True)
+            os.symlink(device, os.path.join(sys_root, "block", disk))
+        os.makedirs(os.path.join(sys_root, "dev", "block"))
+        for dev, target in (("8:1", "sda/sda1"), ("8:17", "sdb/sdb1"), ("8:33", "sdc/sdc1")):
+            disk = target.split("/")[0]
+            os.symlink(os.path.join(os.path.realpath(os.path.join(sys_root, "block", disk)), target.split("/")[1]),
+                       os.path.join(sys_root, "dev", "block", dev))
+
+        mountinfo = os.path.join(root, "mountinfo")
+        with open(mountinfo, "w") as f:
+            f.write("22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw\n"
+                    "90 22 8:17 / /media/user/MY\\040STICK rw,nosuid shared:50 - vfat /dev/sdb1 rw\n"
+                    "91 22 8:33 / /mnt/backup rw shared:51 - ext4 /dev/sdc1 rw\n"
+                    "23 22 0:21 / /proc rw - proc proc rw\n")
+
+        drives = linux_removable_drives(sys_root=sys_root, mountinfo=mountinfo)
+        print(f"Removable: {drives}")
+        table = RemovableDrives(lister=lambda: drives)
+        checks = (table.drive_for("/media/user/MY STICK/docs/a.txt") == "/media/user/MY STICK"
+                  and table.is_removable("/mnt/backup/x.csv")
+                  and not table.is_removable("/home/user/x.csv")
+                  and not table.is_removable("/mnt/backup2/x.csv"))
+        if drives != ["/media/user/MY STICK", "/mnt/backup"] or not checks:
+            print("FAILURE: Wrong removable drives.")
+            sys.exit(1)
+    print("SUCCESS: Removable drives found.")
+
+def test_clipboard_reads():
+    print("\nTesting clipboard reads...")
+    import time
+    import tempfile
+    import threading
+    from src import clipboard
+    from src.clipboard import FakeClipboard, PollingClipboard
+    from src.monitor import SystemMonitor
+
+    # Idle clipboard: the polling backend backs off even though it is asked every 0.05s
+    paste = clipboard.pyperclip.paste
+    clipboard.pyperclip.paste = lambda: "same text"
+    try:
+        polling = PollingClipboard(min_interval=0.1, max_interval=0.4)
+        end = time.monotonic() + 2.0
+        while time.monotonic() < end:
+            polling.wait_for_change(timeout=0.05)
+    finally:
+        clipboard.pyperclip.paste = paste
+    print(f"Polling backend: {polling.reads} reads in 2s")
+    if polling.reads > 10:
+        print("FAILURE: Polling backend doesn't back off.")
+        sys.exit(1)
+
+    # The monitor loop only reads the clipboard when the backend reports a change
+    with tempfile.TemporaryDirectory() as root:
+        monitor = SystemMonitor(watch_paths=[root], index_path=os.path.join(root, "index.db"),
+                                findings_path=None, extract_processes=0)
+        fake = FakeClipboard()
+        monitor.clipboard_backend = fake
+        thread = threading.Thread(target=monitor.start_clipboard_monitor, daemon=True)
+        thread.start()
+        time.sleep(1.0)
+        for text in ("first copy", "second copy", "third copy"):
+            fake.copy(text)
+            time.sleep(0.7)
+        monitor.running = False
+        thread.join(2)
+        monitor.stop()
+    print(f"Monitor: {fake.reads} reads for 3 copies")
+    if fake.reads != 3:
+        print("FAILURE: Clipboard read without a change.")
+        sys.exit(1)
+    print("SUCCESS: Clipboard is only read when needed.")
+
 if __name__ == "__main__":
     test_detector()
+    test_card_scanner()
+    test_stream_boundaries()
+    test_usb_detection()
+    test_clipboard_reads()